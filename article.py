@@ -0,0 +1,167 @@
+"""
+Article Representation
+Compact, slotted article record used from fetch_news through summarize and
+email. Source names are interned (a topic usually has a handful of outlets
+across hundreds of articles) and publishedAt is kept as a parsed datetime.
+
+Article still reads like the dicts it replaced: article["title"],
+article.get("source", "Unknown"), "url" in article and dict(article) all
+work, and Jinja templates can use article.title as before.
+"""
+
+import sys
+from functools import lru_cache
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+# NewsAPI timestamps, e.g. 2024-05-01T08:30:00Z
+_PUBLISHED_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Dict key → attribute
+_FIELDS = {
+    "title": "title",
+    "description": "description",
+    "url": "url",
+    "source": "source",
+    "publishedAt": "published_at",
+    "duplicates": "duplicates",
+}
+
+
+# Feeds repeat timestamps (batches published together, the same story across pages)
+@lru_cache(maxsize=4096)
+def _parse_published(value: Optional[str]) -> Optional[datetime]:
+    if not value or not value[:1].isdigit():
+        return None
+    try:
+        # Fast path for NewsAPI's own format
+        if len(value) == 20 and value[-1] == "Z":
+            return datetime.fromisoformat(value[:-1]).replace(tzinfo=timezone.utc)
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).replace(microsecond=0)
+
+
+class Article:
+    """
+    One news article.
+
+    Attributes:
+        title (str), description (str), url (str): As returned by NewsAPI.
+        source (str): Outlet name (interned).
+        published_at (datetime): Publication time in UTC, or None if unknown.
+        duplicates (list): Merged copies of the story, as {title, url, source} dicts.
+    """
+
+    __slots__ = ("title", "description", "url", "source", "published_at", "duplicates")
+
+    def __init__(self, title: str = "N/A", description: str = "N/A", url: str = "#",
+                 source: str = "Unknown", published_at: Optional[datetime] = None,
+                 duplicates: Optional[List[Dict[str, str]]] = None):
+        self.title = title
+        self.description = description
+        self.url = url
+        self.source = sys.intern(source) if isinstance(source, str) else source
+        self.published_at = published_at
+        self.duplicates = duplicates
+
+    @classmethod
+    def from_newsapi(cls, raw: dict) -> "Article":
+        """Build from one raw NewsAPI article (defaults as the old cleaning loop)."""
+        return cls(
+            title=raw.get("title", "N/A"),
+            description=raw.get("description", "N/A"),
+            url=raw.get("url", "#"),
+            source=(raw.get("source") or {}).get("name", "Unknown"),
+            published_at=_parse_published(raw.get("publishedAt")),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Article":
+        """Build from the dict form (to_dict, cached JSON, older callers)."""
+        if isinstance(data, cls):
+            return data
+        return cls(
+            title=data.get("title", "N/A"),
+            description=data.get("description", "N/A"),
+            url=data.get("url", "#"),
+            source=data.get("source", "Unknown"),
+            published_at=_parse_published(data.get("publishedAt")),
+            duplicates=data.get("duplicates"),
+        )
+
+    @property
+    def published(self) -> str:
+        """publishedAt in NewsAPI's format ("N/A" if unknown)."""
+        return self.published_at.strftime(_PUBLISHED_FORMAT) if self.published_at else "N/A"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"title": self.title, "description": self.description, "url": self.url,
+                "source": self.source, "publishedAt": self.published}
+        if self.duplicates:
+            data["duplicates"] = self.duplicates
+        return data
+
+    # -- dict-compatible access -------------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "publishedAt":
+            return self.published
+        try:
+            return getattr(self, _FIELDS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in _FIELDS:
+            raise KeyError(key)
+        if key == "publishedAt":
+            value = _parse_published(value)
+        setattr(self, _FIELDS[key], value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in _FIELDS:
+            return default
+        value = self[key]
+        return default if value is None else value
+
+    def __contains__(self, key: object) -> bool:
+        return key in _FIELDS and (key != "duplicates" or self.duplicates is not None)
+
+    def keys(self) -> List[str]:
+        return [key for key in _FIELDS if key in self]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Article):
+            other = other.to_dict()
+        return isinstance(other, dict) and self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Article({self.title!r}, source={self.source!r}, publishedAt={self.published!r})"
+
+    def __copy__(self) -> "Article":
+        return Article(self.title, self.description, self.url, self.source, self.published_at,
+                       list(self.duplicates) if self.duplicates is not None else None)
+
+
+def as_articles(items) -> List[Article]:
+    """Articles from a list of Article objects and/or article dicts."""
+    return [Article.from_dict(item) for item in items]
+
+
+def to_json(value: Any) -> Any:
+    """json.dumps default= hook: Article objects are written as their dict form."""
+    if isinstance(value, Article):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,106 @@
+"""
+Article Memory Benchmark
+Compares the memory retained by the old per-article dicts with Article
+objects for the same NewsAPI payload, as the scheduler holds them after a
+large run (raw responses already dropped):
+
+    python benchmarks/article_memory.py
+    python benchmarks/article_memory.py --articles 200000 --json
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from article import Article  # noqa: E402
+
+SOURCES = ["Reuters", "Associated Press", "BBC News", "The Verge", "TechCrunch", "Bloomberg",
+           "CNBC", "The Guardian", "Wired", "Financial Times", "Yahoo Entertainment", "Forbes"]
+
+
+def _payload(count: int, description_bytes: int) -> str:
+    """A NewsAPI response body with `count` articles, as received over the wire."""
+    rng = random.Random(7)
+    words = "market growth startup funding policy launch chip model revenue court energy".split()
+    articles = []
+    for i in range(count):
+        text = " ".join(rng.choices(words, k=description_bytes // 6 + 1))[:description_bytes]
+        articles.append({
+            "source": {"id": None, "name": rng.choice(SOURCES)},
+            "author": "Staff",
+            "title": f"Story {i}: {' '.join(rng.choices(words, k=8))}",
+            "description": text,
+            "url": f"https://news.example.com/2024/05/{i}/{'-'.join(rng.choices(words, k=5))}",
+            "urlToImage": None,
+            "publishedAt": f"2024-05-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00Z",
+            "content": text,
+        })
+    return json.dumps({"status": "ok", "totalResults": count, "articles": articles})
+
+
+def _as_dicts(raw: List[dict]) -> list:
+    """The cleaning loop fetch_news used before Article."""
+    return [{
+        "title": article.get("title", "N/A"),
+        "description": article.get("description", "N/A"),
+        "url": article.get("url", "#"),
+        "source": article.get("source", {}).get("name", "Unknown"),
+        "publishedAt": article.get("publishedAt", "N/A"),
+    } for article in raw]
+
+
+def _as_articles(raw: List[dict]) -> list:
+    return [Article.from_newsapi(article) for article in raw]
+
+
+def measure(name: str, clean: Callable[[List[dict]], list], body: str) -> dict:
+    """Bytes still allocated once the raw response is gone and only the cleaned list remains."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    raw = json.loads(body)["articles"]
+    started = time.perf_counter()
+    kept = clean(raw)
+    elapsed = time.perf_counter() - started
+    del raw
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    result = {
+        "representation": name,
+        "articles": len(kept),
+        "retained_mb": round(retained / 2 ** 20, 2),
+        "bytes_per_article": round(retained / max(1, len(kept))),
+        "clean_ms": round(elapsed * 1000, 1),
+    }
+    del kept
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare article dicts with Article objects")
+    parser.add_argument("--articles", type=int, default=50000)
+    parser.add_argument("--description-bytes", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    body = _payload(args.articles, args.description_bytes)
+    results = [measure("dict", _as_dicts, body), measure("Article", _as_articles, body)]
+    saved = 1 - results[1]["bytes_per_article"] / results[0]["bytes_per_article"]
+
+    if args.json:
+        print(json.dumps({"results": results, "saved_ratio": round(saved, 3)}, indent=2))
+    else:
+        for r in results:
+            print(f"{r['representation']:<8} {r['articles']:>8} articles  {r['retained_mb']:>8.2f} MB  "
+                  f"{r['bytes_per_article']:>5} B/article  cleaned in {r['clean_ms']:.0f}ms")
+        print(f"✓ Article saves {saved:.0%} per article")
@@ -0,0 +1,250 @@
+"""
+Local Stand-ins for NewsAPI, OpenAI and SMTP
+Small in-process servers for benchmarking without real API quota:
+
+- FakeNewsAPI: /v2/everything with configurable latency, article count and
+  description size, plus 429 injection (with Retry-After)
+- FakeOpenAI: OpenAI-compatible /v1/chat/completions, including JSON answers
+  for the multi-topic batch prompt used by summarize_many
+- SMTPSink: accepts EHLO/AUTH/MAIL/RCPT/DATA without TLS and counts messages
+
+Each server runs on a daemon thread, binds to 127.0.0.1 on a free port and
+keeps request counters for the benchmark report.
+"""
+
+import json
+import random
+import re
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlparse
+
+
+_WORDS = ("market growth startup funding policy launch chip model revenue merger court ruling "
+          "election energy climate battery vehicle rocket health vaccine bank rate inflation "
+          "trade export security breach cloud software device network talent layoff").split()
+
+
+class _Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values: Dict[str, int] = {}
+
+    def inc(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.values[name] = self.values.get(name, 0) + value
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def send_json(self, payload: dict, status: int = 200, headers: Dict[str, str] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _HTTPServer:
+    """Base for the HTTP fakes: serve on a daemon thread, stop on close()."""
+
+    handler = _JSONHandler
+
+    def __init__(self):
+        self.counters = _Counters()
+        server = self
+        handler = type("Handler", (self.handler,), {"fake": server})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_port
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _NewsHandler(_JSONHandler):
+    def do_GET(self) -> None:
+        fake: FakeNewsAPI = self.fake
+        fake.counters.inc("requests")
+        if fake.latency:
+            time.sleep(fake.latency)
+        if fake.error_rate and random.random() < fake.error_rate:
+            fake.counters.inc("429")
+            self.send_json({"status": "error", "code": "rateLimited", "message": "slow down"},
+                           status=429, headers={"Retry-After": "0"})
+            return
+
+        query = parse_qs(urlparse(self.path).query)
+        topic = query.get("q", ["news"])[0]
+        page_size = int(query.get("pageSize", ["10"])[0])
+        page = int(query.get("page", ["1"])[0])
+        since = query.get("from", [""])[0]
+        total = fake.total_results
+        start = (page - 1) * page_size
+        count = max(0, min(page_size, total - start))
+        articles = []
+        for i in range(start, start + count):
+            published_at = f"2026-01-01T{(23 - i % 24):02d}:00:00Z"
+            if since and published_at[:len(since)] < since:
+                continue
+            # Distinct text per story, so deduplication sees separate stories
+            words = random.Random(f"{topic}|{i}").choices(_WORDS, k=fake.description_bytes // 6 + 1)
+            filler = " ".join(words)[:fake.description_bytes]
+            articles.append({
+                "source": {"id": None, "name": f"Wire {i % 7}"},
+                "author": "Staff",
+                "title": f"{topic} story {i}: {' '.join(words[:6])}",
+                "description": f"{topic} update {i}: {filler}",
+                "url": f"https://news.example.com/{topic.replace(' ', '-').lower()}/{i}",
+                "urlToImage": None,
+                "publishedAt": published_at,
+                "content": filler,
+            })
+        self.send_json({"status": "ok", "totalResults": total, "articles": articles})
+
+
+class FakeNewsAPI(_HTTPServer):
+    """
+    NewsAPI /v2/everything stand-in.
+
+    Args:
+        latency (float): Seconds to sleep per request.
+        description_bytes (int): Size of each article's description/content.
+        error_rate (float): Fraction of requests answered with 429 + Retry-After: 0.
+        total_results (int): Articles available per query (for pagination).
+    """
+
+    handler = _NewsHandler
+
+    def __init__(self, latency: float = 0.05, description_bytes: int = 200,
+                 error_rate: float = 0.0, total_results: int = 100):
+        self.latency = latency
+        self.description_bytes = description_bytes
+        self.error_rate = error_rate
+        self.total_results = total_results
+        super().__init__()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v2/everything"
+
+
+class _ChatHandler(_JSONHandler):
+    BULLETS = "• Markets moved on the news.\n• Analysts expect follow-up.\n• Regulators are watching."
+
+    def do_POST(self) -> None:
+        fake: FakeOpenAI = self.fake
+        fake.counters.inc("requests")
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+        batch = re.search(r"Topics: (\[.*\])\s*$", prompt, re.S)
+        if batch:
+            fake.counters.inc("batched_topics", len(json.loads(batch.group(1))))
+            content = json.dumps({topic: self.BULLETS for topic in json.loads(batch.group(1))})
+        else:
+            content = self.BULLETS
+
+        self.send_json({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "bench"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4},
+        })
+
+
+class FakeOpenAI(_HTTPServer):
+    """OpenAI-compatible chat completions stand-in with a fixed per-request latency."""
+
+    handler = _ChatHandler
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+        super().__init__()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write((line + "\r\n").encode("ascii"))
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        sink: SMTPSink = self.server.sink
+        sink.counters.inc("connections")
+        self.reply("220 bench-sink ESMTP")
+        in_data = False
+        size = 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line in (b".\r\n", b".\n"):
+                    in_data = False
+                    sink.counters.inc("messages")
+                    sink.counters.inc("bytes", size)
+                    self.reply("250 OK queued")
+                else:
+                    size += len(line)
+                continue
+            command = line[:4].upper()
+            if command in (b"EHLO", b"HELO"):
+                self.reply("250-bench-sink")
+                self.reply("250-AUTH PLAIN LOGIN")
+                self.reply("250 8BITMIME")
+            elif command == b"AUTH":
+                self.reply("235 Authentication successful")
+            elif command == b"DATA":
+                in_data, size = True, 0
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+            elif command == b"QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class SMTPSink:
+    """Plain-text SMTP server that accepts and discards every message (use SMTP_STARTTLS=false)."""
+
+    def __init__(self):
+        self.counters = _Counters()
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+        self._server.daemon_threads = True
+        self._server.sink = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
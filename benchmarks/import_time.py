@@ -0,0 +1,110 @@
+"""
+Startup Import-Time Benchmark
+Measures how long it takes to import the CLI, the summarizer and the web app
+using `python -X importtime`. Also checks that provider SDKs and other heavy
+modules stay out of startup. Exits non-zero on a regression, so it can run in CI:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 250 --json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry points as they are started in production
+TARGETS = {
+    "main": "import main",
+    "summarize": "import summarize",
+    "webapp": "import app",
+    "scheduler": "import planner, job_queue",
+}
+
+# Must only be imported when first used (selected provider, async path, first fetch)
+LAZY_MODULES = ["openai", "google.generativeai", "httpx", "aiosmtplib", "requests"]
+
+
+def measure(statement: str) -> Tuple[float, Dict[str, int], List[str]]:
+    """
+    Run one import statement in a fresh interpreter under -X importtime.
+
+    Returns:
+        tuple: (total milliseconds, cumulative microseconds per imported module,
+                top-level module names)
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([ROOT, os.path.join(ROOT, "webapp"), env.get("PYTHONPATH", "")])
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{result.stderr[-2000:]}")
+
+    modules: Dict[str, int] = {}
+    top_level: List[str] = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Top-level imports are not indented; their cumulative times add up to the total
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+            top_level.append(name.strip())
+        modules[name.strip()] = int(cumulative)
+    return total_us / 1000, modules, top_level
+
+
+def run(repeat: int, budget_ms: float = None) -> Tuple[List[dict], List[str]]:
+    """Measure every target (best of `repeat` runs) and collect regressions."""
+    results, problems = [], []
+    # Interpreter startup (site, encodings, ...) is paid by every target; subtract it
+    baseline_ms, baseline, _ = min((measure("pass") for _ in range(repeat)), key=lambda run: run[0])
+    for name, statement in TARGETS.items():
+        runs = [measure(statement) for _ in range(repeat)]
+        total_ms, modules, top_level = min(runs, key=lambda run: run[0])
+        best_ms = max(0.0, total_ms - baseline_ms)
+        dependencies = [(module, us) for module, us in modules.items()
+                        if module not in baseline and module not in top_level]
+        heaviest = sorted(dependencies, key=lambda item: item[1], reverse=True)[:5]
+        eager = [module for module in LAZY_MODULES if module in modules]
+        results.append({
+            "target": name,
+            "ms": round(best_ms, 1),
+            "heaviest": [(module, round(us / 1000, 1)) for module, us in heaviest],
+            "eager_imports": eager,
+        })
+        if eager:
+            problems.append(f"{name}: imports {', '.join(eager)} at startup")
+        if budget_ms and best_ms > budget_ms:
+            problems.append(f"{name}: {best_ms:.0f}ms exceeds budget of {budget_ms:.0f}ms")
+    return results, problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure News-Flash startup import time")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per target; the fastest is reported")
+    parser.add_argument("--budget-ms", type=float, help="Fail if any target takes longer than this")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results, problems = run(args.repeat, args.budget_ms)
+
+    if args.json:
+        print(json.dumps({"results": results, "problems": problems}, indent=2))
+    else:
+        for result in results:
+            heaviest = ", ".join(f"{module} {ms}ms" for module, ms in result["heaviest"])
+            print(f"{result['target']:<10} {result['ms']:>8.1f}ms   heaviest: {heaviest}")
+        for problem in problems:
+            print(f"✗ {problem}")
+        if not problems:
+            print("✓ No startup regressions")
+
+    sys.exit(1 if problems else 0)
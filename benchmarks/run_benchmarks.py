@@ -0,0 +1,309 @@
+"""
+Offline Benchmark Suite
+Drives run_pipeline, send_user_emails and the Flask /news/<id> route against
+local stand-ins for NewsAPI, OpenAI and SMTP (see benchmarks/fakes.py), so
+throughput can be measured without spending API quota.
+
+Each (scenario, users) case runs in a fresh interpreter and reports
+throughput, p50/p99 latency, peak RSS and upstream call counts. Results are
+saved to benchmarks/results/<commit>.json for comparison between commits:
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --scenario scheduler --users 10,1000,100000
+    python benchmarks/run_benchmarks.py --compare 1a2b3c4
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+RESULTS_DIR = os.path.join(HERE, "results")
+SCENARIOS = ("pipeline", "scheduler", "web")
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of values (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _commit() -> str:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# -- child process: one scenario at one scale ---------------------------------
+
+def _start_fakes(args, workdir: str) -> dict:
+    """Start the stand-in servers and point the project's configuration at them."""
+    sys.path.insert(0, HERE)
+    from fakes import FakeNewsAPI, FakeOpenAI, SMTPSink
+
+    news = FakeNewsAPI(latency=args.news_latency, description_bytes=args.description_bytes,
+                       error_rate=args.error_rate)
+    llm = FakeOpenAI(latency=args.llm_latency)
+    smtp = SMTPSink()
+
+    # Config reads these at import time, so they must be set before any project import
+    os.environ.update({
+        "NEWS_API_KEY": "bench", "NEWS_API_URL": news.url, "NEWS_API_BACKOFF": "0.01",
+        "AI_PROVIDER": "OPENAI", "OPENAI_API_KEY": "bench", "OPENAI_BASE_URL": llm.base_url,
+        "EMAIL_SENDER": "bench@example.com", "EMAIL_PASSWORD": "bench",
+        "EMAIL_RECIPIENT": "reader@example.com",
+        "SMTP_SERVER": "127.0.0.1", "SMTP_PORT": str(smtp.port), "SMTP_STARTTLS": "false",
+        "SMTP_RATE_PER_CONNECTION": "0",
+        "DATABASE_URL": "sqlite:///" + os.path.join(workdir, "bench.db"),
+        "SUMMARY_CACHE_PATH": os.path.join(workdir, "summary_cache.db"),
+        "SINGLEFLIGHT_DB": os.path.join(workdir, "singleflight.db"),
+        "TOPIC_CACHE_TTL": "0", "DIGEST_COLD_WAIT": "30",
+    })
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.join(ROOT, "webapp"))
+    return {"newsapi": news, "llm": llm, "smtp": smtp}
+
+
+def _seed_users(users: int, topics: int, topics_per_user: int) -> None:
+    """Bulk-insert users (all due now) with topics drawn from a shared pool."""
+    from werkzeug.security import generate_password_hash
+    from app import app, db, User, NewsPreference
+
+    password_hash = generate_password_hash("bench")
+    due = datetime.utcnow() - timedelta(minutes=1)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        for start in range(0, users, 5000):
+            ids = range(start + 1, min(users, start + 5000) + 1)
+            db.session.execute(User.__table__.insert(), [{
+                "id": i, "username": f"user{i}", "email": f"user{i}@example.com",
+                "password_hash": password_hash, "preferred_email_time": "08:00",
+                "timezone": "UTC", "email_enabled": True, "next_send_at": due, "created_at": due,
+            } for i in ids])
+            db.session.execute(NewsPreference.__table__.insert(), [{
+                "user_id": i, "topic": f"Topic {(i + k) % topics}", "max_articles": 5 + 5 * (i % 2),
+                "created_at": due,
+            } for i in ids for k in range(topics_per_user)])
+        db.session.commit()
+
+
+def _scenario_pipeline(args) -> dict:
+    """One run_pipeline (fetch → summarize → email) per user, `concurrency` at a time."""
+    from main import run_pipeline
+
+    def one(i: int) -> float:
+        started = time.perf_counter()
+        run_pipeline(topic=f"Topic {i % args.topics}", recipient=f"user{i}@example.com",
+                     max_articles=10)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = list(pool.map(one, range(args.users)))
+    wall = time.perf_counter() - started
+    return {"operations": args.users, "unit": "runs", "wall_seconds": wall, "latencies": latencies}
+
+
+def _scenario_scheduler(args) -> dict:
+    """One send_user_emails() pass over `users` due users (latencies are per-send bucket bounds)."""
+    import metrics
+    _seed_users(args.users, args.topics, args.topics_per_user)
+    import send_scheduled_emails
+
+    started = time.perf_counter()
+    send_scheduled_emails.send_user_emails()
+    wall = time.perf_counter() - started
+    sends = metrics.registry.snapshot()["histograms"].get("newsflash_pipeline_item_seconds", [])
+    send = next((h for h in sends if h["labels"].get("stage") == "send"), {})
+    return {"operations": args.users, "unit": "emails", "wall_seconds": wall,
+            "p50_override": send.get("p50"), "p99_override": send.get("p99")}
+
+
+def _scenario_web(args) -> dict:
+    """GET /news/<id> once per user as a logged-in client, `concurrency` at a time."""
+    _seed_users(args.users, args.topics, 1)
+    from app import app, NewsPreference
+
+    with app.app_context():
+        pref_ids = dict(NewsPreference.query.with_entities(NewsPreference.user_id, NewsPreference.id).all())
+
+    def one(user_id: int) -> float:
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = str(user_id)
+            session["_fresh"] = True
+        started = time.perf_counter()
+        response = client.get(f"/news/{pref_ids[user_id]}")
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"/news returned {response.status_code} for user {user_id}")
+        return elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = list(pool.map(one, range(1, args.users + 1)))
+    wall = time.perf_counter() - started
+    return {"operations": args.users, "unit": "requests", "wall_seconds": wall, "latencies": latencies}
+
+
+def run_child(args) -> dict:
+    with tempfile.TemporaryDirectory(prefix="newsflash-bench-") as workdir:
+        fakes = _start_fakes(args, workdir)
+        scenario = {"pipeline": _scenario_pipeline, "scheduler": _scenario_scheduler,
+                    "web": _scenario_web}[args.scenario]
+        # The project logs every step with print(); keep the report readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            raw = scenario(args)
+
+        latencies = raw.pop("latencies", [])
+        wall = raw["wall_seconds"]
+        return {
+            "scenario": args.scenario,
+            "users": args.users,
+            "unit": raw["unit"],
+            "throughput": round(raw["operations"] / wall, 2) if wall else 0.0,
+            "wall_seconds": round(wall, 3),
+            "p50_ms": round(1000 * (raw.get("p50_override") or _percentile(latencies, 0.5)), 2),
+            "p99_ms": round(1000 * (raw.get("p99_override") or _percentile(latencies, 0.99)), 2),
+            "peak_rss_mb": _peak_rss_mb(),
+            "upstream": {name: dict(fake.counters.values) for name, fake in fakes.items()},
+        }
+
+
+# -- parent: run the matrix, store and compare results ------------------------
+
+def run_matrix(args) -> List[dict]:
+    results = []
+    scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+    for scenario in scenarios:
+        for users in [int(n) for n in args.users.split(",")]:
+            with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as out:
+                out_path = out.name
+            command = [sys.executable, os.path.abspath(__file__), "--child", out_path,
+                       "--scenario", scenario, "--users", str(users)]
+            for option in ("topics", "topics_per_user", "concurrency", "news_latency",
+                           "llm_latency", "description_bytes", "error_rate"):
+                command += [f"--{option.replace('_', '-')}", str(getattr(args, option))]
+            print(f"→ {scenario} with {users} users...", flush=True)
+            completed = subprocess.run(command, cwd=ROOT)
+            try:
+                if completed.returncode != 0:
+                    print(f"✗ {scenario}/{users} failed (exit {completed.returncode})")
+                    continue
+                with open(out_path, encoding="utf-8") as fh:
+                    result = json.load(fh)
+            finally:
+                os.unlink(out_path)
+            results.append(result)
+            print(f"  {_format_result(result)}")
+    return results
+
+
+def _format_result(result: dict) -> str:
+    return (f"{result['scenario']:<10} {result['users']:>7} users  "
+            f"{result['throughput']:>9.1f} {result['unit']}/s  p50 {result['p50_ms']:>8.1f}ms  "
+            f"p99 {result['p99_ms']:>8.1f}ms  rss {result['peak_rss_mb']:>7.1f}MB")
+
+
+def save_results(results: List[dict], args) -> str:
+    """Merge results into benchmarks/results/<commit>.json (one entry per scenario and scale)."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    commit = _commit()
+    path = os.path.join(RESULTS_DIR, f"{commit}.json")
+    stored = {"commit": commit, "results": []}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as fh:
+            stored = json.load(fh)
+    fresh = {(r["scenario"], r["users"]) for r in results}
+    stored["results"] = [r for r in stored["results"] if (r["scenario"], r["users"]) not in fresh] + results
+    stored["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    stored["python"] = sys.version.split()[0]
+    stored["settings"] = {k: getattr(args, k) for k in ("topics", "topics_per_user", "concurrency",
+                                                       "news_latency", "llm_latency",
+                                                       "description_bytes", "error_rate")}
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(stored, fh, indent=2)
+    return path
+
+
+def compare(base: str) -> None:
+    """Print this commit's stored results next to another commit's."""
+    def load(commit: str) -> Dict[tuple, dict]:
+        matches = sorted(name for name in os.listdir(RESULTS_DIR) if name.startswith(commit))
+        if not matches:
+            raise SystemExit(f"No stored results for {commit} in {RESULTS_DIR}")
+        with open(os.path.join(RESULTS_DIR, matches[0]), encoding="utf-8") as fh:
+            return {(r["scenario"], r["users"]): r for r in json.load(fh)["results"]}
+
+    current, previous = load(_commit()), load(base)
+    print(f"{'case':<22} {'throughput':>22} {'p99 ms':>22} {'rss MB':>20}")
+    for key in sorted(current.keys() & previous.keys()):
+        new, old = current[key], previous[key]
+
+        def delta(field: str) -> str:
+            change = (new[field] - old[field]) / old[field] * 100 if old[field] else 0.0
+            return f"{old[field]:>8.1f} → {new[field]:>8.1f} ({change:+.0f}%)"
+
+        print(f"{key[0] + '/' + str(key[1]):<22} {delta('throughput'):>22} "
+              f"{delta('p99_ms'):>22} {delta('peak_rss_mb'):>20}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="News-Flash offline benchmarks")
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--users", default="10,100,1000", help="Comma-separated scales (up to 100000)")
+    parser.add_argument("--topics", type=int, default=50, help="Distinct topics shared by the users")
+    parser.add_argument("--topics-per-user", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads for pipeline/web")
+    parser.add_argument("--news-latency", type=float, default=0.05, help="Fake NewsAPI latency (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fake LLM latency (s)")
+    parser.add_argument("--description-bytes", type=int, default=200, help="Article description size")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of NewsAPI calls answered 429")
+    parser.add_argument("--compare", metavar="COMMIT", help="Compare stored results of HEAD with COMMIT")
+    parser.add_argument("--no-save", action="store_true", help="Do not store results")
+    parser.add_argument("--child", metavar="OUT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.users = int(args.users)
+        result = run_child(args)
+        with open(args.child, "w", encoding="utf-8") as fh:
+            json.dump(result, fh)
+        sys.exit(0)
+
+    if args.compare:
+        compare(args.compare)
+        sys.exit(0)
+
+    results = run_matrix(args)
+    if results and not args.no_save:
+        print(f"✓ Results saved to {save_results(results, args)}")
+    sys.exit(0 if results else 1)
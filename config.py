@@ -4,6 +4,7 @@ Loads environment variables from .env file.
 """
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -15,7 +16,14 @@ class Config:
     
     # NewsAPI configuration
     NEWS_API_KEY = os.getenv("NEWS_API_KEY")
-    NEWS_API_URL = "https://newsapi.org/v2/everything"
+    NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")
+    NEWS_API_POOL_SIZE = int(os.getenv("NEWS_API_POOL_SIZE", "10"))
+    NEWS_API_RETRIES = int(os.getenv("NEWS_API_RETRIES", "3"))
+    NEWS_API_BACKOFF = float(os.getenv("NEWS_API_BACKOFF", "0.5"))
+    # Longest wait between retries (seconds), also for the server's Retry-After
+    NEWS_API_BACKOFF_MAX = float(os.getenv("NEWS_API_BACKOFF_MAX", "30"))
+    # Largest pageSize NewsAPI accepts; bigger requests are fetched page by page
+    NEWS_API_PAGE_SIZE = int(os.getenv("NEWS_API_PAGE_SIZE", "100"))
     
     # Provider selection: OPENAI or GEMINI
     AI_PROVIDER = os.getenv("AI_PROVIDER", "OPENAI").upper()
@@ -23,24 +31,101 @@ class Config:
     # OpenAI configuration
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    # OpenAI-compatible endpoint (unset = api.openai.com)
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
 
     # Gemini configuration
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+    # How long to keep using the last Gemini model that worked (seconds)
+    GEMINI_MODEL_TTL = int(os.getenv("GEMINI_MODEL_TTL", "3600"))
     
     # Email configuration
     EMAIL_SENDER = os.getenv("EMAIL_SENDER")
     EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
     EMAIL_RECIPIENT = os.getenv("EMAIL_RECIPIENT")
-    SMTP_SERVER = "smtp.gmail.com"
-    SMTP_PORT = 587
+    SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+    SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+    # Bulk sending: pooled connections, messages/second and messages per connection
+    SMTP_CONNECTIONS = int(os.getenv("SMTP_CONNECTIONS", "2"))
+    SMTP_RATE_PER_CONNECTION = float(os.getenv("SMTP_RATE_PER_CONNECTION", "5"))
+    SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+    # Pooled connections idle this long (seconds) are closed between scheduler ticks
+    SMTP_IDLE_TIMEOUT = int(os.getenv("SMTP_IDLE_TIMEOUT", "240"))
     
     # News topic
     NEWS_TOPIC = os.getenv("NEWS_TOPIC", "Indian Startups")
     
     # Number of articles to fetch
     MAX_ARTICLES = 10
-    
+
+    # Collapse duplicate and near-duplicate stories (estimated Jaccard similarity of title + description)
+    DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.5"))
+
+    # Scheduled digests only contain articles newer than what each user was last sent
+    INCREMENTAL_DIGESTS = os.getenv("INCREMENTAL_DIGESTS", "true").lower() == "true"
+
+    # Shared topic cache for scheduled sends (TTL in seconds, 0 = current run only)
+    TOPIC_CACHE_TTL = int(os.getenv("TOPIC_CACHE_TTL", "0"))
+    TOPIC_CACHE_PATH = os.getenv("TOPIC_CACHE_PATH", "topic_cache.json")
+
+    # Persistent summary cache keyed on the article set (max age in seconds)
+    SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+    SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "summary_cache.db")
+    SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000"))
+    SUMMARY_CACHE_MAX_AGE = int(os.getenv("SUMMARY_CACHE_MAX_AGE", "21600"))
+
+    # Prompt size per topic: tokens for the article block, and per article description
+    SUMMARY_INPUT_TOKEN_BUDGET = int(os.getenv("SUMMARY_INPUT_TOKEN_BUDGET", "1500"))
+    SUMMARY_DESCRIPTION_TOKENS = int(os.getenv("SUMMARY_DESCRIPTION_TOKENS", "60"))
+
+    # Multi-topic summarization: estimated prompt tokens and topics per request
+    SUMMARY_BATCH_TOKEN_BUDGET = int(os.getenv("SUMMARY_BATCH_TOKEN_BUDGET", "6000"))
+    SUMMARY_BATCH_MAX_TOPICS = int(os.getenv("SUMMARY_BATCH_MAX_TOPICS", "8"))
+
+    # Single-flight coalescing of identical in-flight calls ("" = this process only)
+    SINGLEFLIGHT_DB = os.getenv(
+        "SINGLEFLIGHT_DB", os.path.join(tempfile.gettempdir(), "newsflash_singleflight.db")
+    )
+    SINGLEFLIGHT_LEASE_TTL = float(os.getenv("SINGLEFLIGHT_LEASE_TTL", "60"))
+    SINGLEFLIGHT_POLL_INTERVAL = float(os.getenv("SINGLEFLIGHT_POLL_INTERVAL", "0.1"))
+
+    # Web app digests: fresh for DIGEST_TTL seconds, cold loads wait DIGEST_COLD_WAIT
+    DIGEST_TTL = int(os.getenv("DIGEST_TTL", "900"))
+    # Empty results (no articles or NewsAPI down) are retried after this many seconds
+    DIGEST_EMPTY_TTL = int(os.getenv("DIGEST_EMPTY_TTL", "60"))
+    DIGEST_COLD_WAIT = float(os.getenv("DIGEST_COLD_WAIT", "8"))
+    DIGEST_REFRESH_WORKERS = int(os.getenv("DIGEST_REFRESH_WORKERS", "4"))
+
+    # Scheduler daemon: seconds between checks for due users
+    SCHEDULER_TICK = int(os.getenv("SCHEDULER_TICK", "60"))
+
+    # Worker pool sizes for the scheduled-send pipeline stages
+    # (send threads share the mailer's SMTP_CONNECTIONS pooled connections)
+    FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "4"))
+    SUMMARIZE_WORKERS = int(os.getenv("SUMMARIZE_WORKERS", "4"))
+    SMTP_WORKERS = int(os.getenv("SMTP_WORKERS", "2"))
+
+    # Durable send-job queue: lease length, attempts per job, retry delay (seconds), claim size
+    SEND_JOB_LEASE = int(os.getenv("SEND_JOB_LEASE", "900"))
+    SEND_JOB_MAX_ATTEMPTS = int(os.getenv("SEND_JOB_MAX_ATTEMPTS", "3"))
+    SEND_JOB_RETRY_DELAY = int(os.getenv("SEND_JOB_RETRY_DELAY", "300"))
+    SEND_JOB_BATCH = int(os.getenv("SEND_JOB_BATCH", "500"))
+
+    # Concurrency limits per upstream service for the async pipeline
+    NEWS_API_CONCURRENCY = int(os.getenv("NEWS_API_CONCURRENCY", "10"))
+    LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "5"))
+    SMTP_CONCURRENCY = int(os.getenv("SMTP_CONCURRENCY", "3"))
+
+    @classmethod
+    def ai_model(cls):
+        """(provider, model) summaries are generated with: ("GEMINI", GEMINI_MODEL) or ("OPENAI", OPENAI_MODEL)."""
+        if (cls.AI_PROVIDER or "OPENAI").upper() == "GEMINI":
+            return "GEMINI", cls.GEMINI_MODEL or ""
+        return "OPENAI", cls.OPENAI_MODEL or ""
+
     @classmethod
     def validate(cls):
         """Validate that all required configuration is present."""
@@ -0,0 +1,245 @@
+"""
+Article Deduplication
+Collapses copies of the same story before summarization: exact duplicates by
+canonical URL, and near-duplicates (the same wire story syndicated by several
+outlets) by MinHash similarity of title and description.
+
+Only one representative per cluster is kept; the others are listed under it
+in "duplicates" so the email can show "also reported by" without repeating
+the story or paying prompt tokens for every copy.
+"""
+
+import copy
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from config import Config
+
+# Query parameters that only track the click, never change the article
+_TRACKING_PARAMS = {"fbclid", "gclid", "ocid", "cmpid", "mc_cid", "mc_eid", "smid", "ref", "ref_src", "src"}
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# MinHash signature length and LSH banding: NUM_PERM = BANDS * ROWS. With 16 bands
+# of 4 rows, pairs above ~0.7 Jaccard similarity almost always share a bucket.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# Offset separating values borrowed by empty bins from real bin minima
+_BORROWED = 1 << 32
+
+
+def canonical_url(url: Optional[str]) -> str:
+    """
+    Normalize a URL so trivially different links to one article compare equal:
+    scheme, "www.", "amp" paths, fragments, trailing slashes and tracking
+    parameters (utm_*, fbclid, ...) are ignored.
+    """
+    if not url or url == "#":
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("amp."):
+        host = host[4:]
+    path = re.sub(r"/(amp|index\.html?)/?$", "", parts.path).rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    ))
+    return urlunsplit(("", host, path, query, ""))
+
+
+def _shingles(article: Dict[str, str]) -> List[int]:
+    """32-bit hashes of the word 3-grams of title + description."""
+    text = f"{article.get('title') or ''} {article.get('description') or ''}".lower()
+    # Outlets append " - Reuters" etc. to syndicated titles; the words still mostly match
+    words = _WORD_RE.findall(text)
+    if len(words) < SHINGLE_SIZE:
+        return [zlib.crc32(" ".join(words).encode("utf-8"))] if words else []
+    return list({
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    })
+
+
+def _signature(shingles: List[int]) -> Tuple[int, ...]:
+    """
+    One-permutation MinHash: each shingle hash is assigned to one of NUM_PERM
+    bins and every bin keeps its minimum, so a signature costs one pass over
+    the shingles instead of NUM_PERM. Empty bins borrow the value of the next
+    non-empty bin (rotation densification) so short texts still compare fairly.
+    """
+    if not shingles:
+        return ()
+    bins: List[Optional[int]] = [None] * NUM_PERM
+    for x in shingles:
+        index, value = x % NUM_PERM, x // NUM_PERM
+        current = bins[index]
+        if current is None or value < current:
+            bins[index] = value
+
+    signature = []
+    for index in range(NUM_PERM):
+        distance = 0
+        while bins[(index + distance) % NUM_PERM] is None:
+            distance += 1
+        signature.append(bins[(index + distance) % NUM_PERM] + distance * _BORROWED)
+    return tuple(signature)
+
+
+def _clusters(articles: Sequence[Dict[str, str]], threshold: float) -> List[int]:
+    """Cluster id (index of the first member) for every article."""
+    parent = list(range(len(articles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        i, j = find(i), find(j)
+        if i != j:
+            parent[max(i, j)] = min(i, j)
+
+    # Exact duplicates: same canonical URL or same normalized title
+    seen: Dict[str, int] = {}
+    for index, article in enumerate(articles):
+        title = " ".join(_WORD_RE.findall((article.get("title") or "").lower()))
+        for key in (f"url:{canonical_url(article.get('url'))}", f"title:{title}"):
+            if key in ("url:", "title:"):
+                continue
+            if key in seen:
+                union(seen[key], index)
+            else:
+                seen[key] = index
+
+    # Near duplicates: candidates share an LSH band, confirmed by signature agreement
+    signatures = [_signature(_shingles(article)) for article in articles]
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    for index, signature in enumerate(signatures):
+        if not signature:
+            continue
+        for band in range(BANDS):
+            buckets.setdefault((band, signature[band * ROWS:(band + 1) * ROWS]), []).append(index)
+
+    checked = set()
+    for members in buckets.values():
+        for position, i in enumerate(members):
+            for j in members[position + 1:]:
+                if (i, j) in checked or find(i) == find(j):
+                    continue
+                checked.add((i, j))
+                agreement = sum(x == y for x, y in zip(signatures[i], signatures[j])) / NUM_PERM
+                if agreement >= threshold:
+                    union(i, j)
+
+    return [find(i) for i in range(len(articles))]
+
+
+def _informativeness(article: Dict[str, str]) -> int:
+    return len(article.get("title") or "") + len(article.get("description") or "")
+
+
+def _merge_duplicates(owner: Dict[str, str], articles: List[Dict[str, str]]) -> None:
+    """Attach articles (and their own duplicates) to owner, once per canonical URL."""
+    duplicates = list(owner.get("duplicates") or [])
+    seen = {canonical_url(owner.get("url"))} | {canonical_url(dup.get("url")) for dup in duplicates}
+    for article in articles:
+        for entry in [article] + list(article.get("duplicates") or []):
+            url = canonical_url(entry.get("url"))
+            if url and url in seen:
+                continue
+            seen.add(url)
+            duplicates.append({"title": entry.get("title"), "url": entry.get("url"), "source": entry.get("source")})
+    if duplicates:
+        owner["duplicates"] = duplicates
+
+
+def dedup_articles(articles: List[Dict[str, str]], threshold: float = None) -> List[Dict[str, str]]:
+    """
+    Collapse exact and near-duplicate articles into one representative each.
+
+    The representative is the most informative member (longest title and
+    description) and takes the position of the cluster's first member, so the
+    NewsAPI ordering is kept. The other members are attached to it as
+    "duplicates" (title, url, source); input dicts are not modified.
+
+    Args:
+        articles (List[Dict]): Cleaned articles as returned by fetch_news.
+        threshold (float): Estimated Jaccard similarity above which two
+            articles are the same story. Defaults to DEDUP_THRESHOLD from config.
+
+    Returns:
+        List[Dict]: One article per story.
+    """
+    if len(articles) < 2:
+        return articles
+    threshold = Config.DEDUP_THRESHOLD if threshold is None else threshold
+
+    clusters: Dict[int, List[int]] = {}
+    for index, cluster in enumerate(_clusters(articles, threshold)):
+        clusters.setdefault(cluster, []).append(index)
+    if len(clusters) == len(articles):
+        return articles
+
+    deduped = []
+    for first in sorted(clusters):
+        members = clusters[first]
+        best = max(members, key=lambda i: (_informativeness(articles[i]), -i))
+        representative = copy.copy(articles[best])
+        _merge_duplicates(representative, [articles[i] for i in members if i != best])
+        deduped.append(representative)
+    return deduped
+
+
+def dedup_sections(sections: List[Tuple[str, str, List[Dict[str, str]]]],
+                   threshold: float = None) -> List[Tuple[str, str, List[Dict[str, str]]]]:
+    """
+    Remove stories already shown in an earlier section of the same digest.
+
+    A user following "AI", "Technology" and "Startups" sees a shared story only
+    under the first of those topics, with the other copies listed as its
+    duplicates. Sections left without articles keep their summary.
+
+    Args:
+        sections (List[Tuple]): (topic, summary, articles) per topic, in digest order.
+        threshold (float): See dedup_articles.
+
+    Returns:
+        List[Tuple]: Sections with cross-topic repeats removed.
+    """
+    flat = [(position, article) for position, (_, _, articles) in enumerate(sections) for article in articles]
+    if len(flat) < 2:
+        return sections
+    threshold = Config.DEDUP_THRESHOLD if threshold is None else threshold
+    clusters = _clusters([article for _, article in flat], threshold)
+
+    kept: Dict[int, Dict[str, str]] = {}
+    dropped = set()
+    for index, cluster in enumerate(clusters):
+        # Duplicates inside one section were already merged by dedup_articles; keep those as-is
+        if cluster == index or flat[index][0] == flat[cluster][0]:
+            continue
+        owner = kept.get(cluster)
+        if owner is None:
+            owner = kept[cluster] = copy.copy(flat[cluster][1])
+        _merge_duplicates(owner, [flat[index][1]])
+        dropped.add(index)
+    if not dropped:
+        return sections
+
+    result = []
+    index = 0
+    for topic, summary, articles in sections:
+        remaining = []
+        for article in articles:
+            if index not in dropped:
+                remaining.append(kept.get(index, article))
+            index += 1
+        result.append((topic, summary, remaining))
+    return result
@@ -3,36 +3,44 @@ Phase 3: Email Automation
 This module handles sending formatted email notifications with news summaries.
 """
 
+import queue
 import smtplib
+import threading
+import time
+from collections import OrderedDict
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional, Tuple
+import metrics
 from config import Config
 
 
-def create_email_body(summary: str, articles: List[Dict[str, str]]) -> tuple:
+class _Template:
     """
-    Create HTML and plain text email body.
-    
-    Args:
-        summary (str): The AI-generated summary with bullet points.
-        articles (List[Dict]): List of articles for links.
-    
-    Returns:
-        tuple: (html_body, text_body) for email content.
+    A template compiled once into literal chunks and slot names, so rendering
+    is a single join with no parsing or f-string formatting per message.
+    Slots are written as {{name}}.
     """
     
-    # Generate article links
-    article_links = ""
-    for article in articles:
-        title = article.get("title", "Untitled")
-        url = article.get("url", "#")
-        source = article.get("source", "Unknown")
-        article_links += f'<li><a href="{url}">{title}</a><br><small>{source}</small></li>\n'
+    def __init__(self, source: str):
+        parts = source.split("{{")
+        self._chunks = [parts[0]]
+        self._slots = []
+        for part in parts[1:]:
+            name, literal = part.split("}}", 1)
+            self._slots.append(name)
+            self._chunks.append(literal)
     
-    # HTML email body
-    html_body = f"""
+    def render(self, **values: str) -> str:
+        out = [self._chunks[0]]
+        for name, literal in zip(self._slots, self._chunks[1:]):
+            out.append(values[name])
+            out.append(literal)
+        return "".join(out)
+
+
+_HTML_SHELL = _Template("""
     <html>
         <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
             <div style="max-width: 600px; margin: 0 auto;">
@@ -43,58 +51,165 @@ def create_email_body(summary: str, articles: List[Dict[str, str]]) -> tuple:
                 
                 <section style="padding: 20px; background: #f9f9f9;">
                     <h2 style="color: #667eea; border-bottom: 2px solid #667eea; padding-bottom: 10px;">
-                        📰 {Config.NEWS_TOPIC}
+                        📰 {{topic}}
                     </h2>
-                    <p style="color: #666; font-size: 14px;">Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
+                    <p style="color: #666; font-size: 14px;">Generated on {{generated}}</p>
                 </section>
-                
+                {{sections}}
+                <footer style="background: #333; color: white; padding: 15px; text-align: center; border-radius: 0 0 8px 8px; font-size: 12px;">
+                    <p style="margin: 0;">Powered by News-Flash • NewsAPI • OpenAI GPT</p>
+                    <p style="margin: 5px 0 0 0; opacity: 0.8;">🚀 Your Daily Briefing in 60 Seconds</p>
+                </footer>
+            </div>
+        </body>
+    </html>
+    """)
+
+_HTML_SECTION = _Template("""
                 <section style="padding: 20px;">
-                    <h3 style="color: #333; margin-top: 0;">📌 Key Highlights</h3>
+                    <h3 style="color: #333; margin-top: 0;">📌 {{heading}}</h3>
                     <div style="background: #f0f4ff; padding: 15px; border-left: 4px solid #667eea; border-radius: 4px;">
-                        {summary.replace(chr(10), '<br>')}
+                        {{summary}}
                     </div>
                 </section>
                 
                 <section style="padding: 20px; background: #f9f9f9;">
                     <h3 style="color: #333;">📚 Full Articles</h3>
                     <ul style="list-style-type: none; padding: 0;">
-                        {article_links}
+                        {{articles}}
                     </ul>
                 </section>
-                
-                <footer style="background: #333; color: white; padding: 15px; text-align: center; border-radius: 0 0 8px 8px; font-size: 12px;">
-                    <p style="margin: 0;">Powered by News-Flash • NewsAPI • OpenAI GPT</p>
-                    <p style="margin: 5px 0 0 0; opacity: 0.8;">🚀 Your Daily Briefing in 60 Seconds</p>
-                </footer>
-            </div>
-        </body>
-    </html>
-    """
-    
-    # Plain text email body
-    text_body = f"""
-News-Flash: Your 60-Second News Summary
+                """)
+
+_TEXT_SHELL = _Template("""News-Flash: Your 60-Second News Summary
 ========================================
 
-📰 {Config.NEWS_TOPIC}
-Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
+📰 {{topic}}
+Generated on {{generated}}
+{{sections}}
+========================================
+Powered by News-Flash • NewsAPI • OpenAI GPT
+🚀 Your Daily Briefing in 60 Seconds""")
 
-📌 KEY HIGHLIGHTS:
-{summary}
+_TEXT_SECTION = _Template("""
+📌 {{heading}}:
+{{summary}}
 
 📚 FULL ARTICLES:
-{chr(10).join([f"- {article.get('title')} ({article.get('source')})\n  {article.get('url')}" for article in articles])}
+{{articles}}
+""")
 
-========================================
-Powered by News-Flash • NewsAPI • OpenAI GPT
-🚀 Your Daily Briefing in 60 Seconds
+# Rendered (html, text) section fragments, shared by every recipient of a topic digest
+_MAX_FRAGMENTS = 512
+_fragments: "OrderedDict[tuple, Tuple[str, str]]" = OrderedDict()
+_fragments_lock = threading.Lock()
+
+
+def _render_section(heading: str, summary: str, articles: List[Dict[str, str]]) -> Tuple[str, str]:
+    """Return the cached (html, text) fragment for one topic section."""
+    key = (heading, summary, tuple(
+        (article.get("title"), article.get("url"), article.get("source"),
+         tuple((dup.get("source"), dup.get("url")) for dup in article.get("duplicates") or ()))
+        for article in articles
+    ))
+    with _fragments_lock:
+        cached = _fragments.get(key)
+        if cached is not None:
+            _fragments.move_to_end(key)
+            return cached
+    
+    # Merged copies of a story are listed under it instead of repeated
+    article_links = "".join(
+        f'<li><a href="{url or "#"}">{title or "Untitled"}</a><br><small>{source or "Unknown"}'
+        + ("".join(f' · <a href="{dup_url or "#"}">{dup_source or "Unknown"}</a>'
+                   for dup_source, dup_url in duplicates) if duplicates else "")
+        + '</small></li>\n'
+        for title, url, source, duplicates in key[2]
+    )
+    text_links = "\n".join(
+        f"- {title} ({source})\n  {url}"
+        + "".join(f"\n  also: {dup_source} {dup_url}" for dup_source, dup_url in duplicates)
+        for title, url, source, duplicates in key[2]
+    )
+    
+    fragment = (
+        _HTML_SECTION.render(heading=heading, summary=summary.replace("\n", "<br>"), articles=article_links),
+        _TEXT_SECTION.render(heading=heading.upper(), summary=summary, articles=text_links),
+    )
+    with _fragments_lock:
+        _fragments[key] = fragment
+        while len(_fragments) > _MAX_FRAGMENTS:
+            _fragments.popitem(last=False)
+    return fragment
+
+
+def create_digest_body(sections: List[Tuple[str, str, List[Dict[str, str]]]],
+                       title: str = None) -> tuple:
+    """
+    Create HTML and plain text bodies for a digest of one or more topics.
+    
+    Each (topic, summary, articles) section is rendered once and reused for
+    every recipient of the same digest; only the shell is filled per message.
+    
+    Args:
+        sections (List[Tuple]): (topic, summary, articles) per topic.
+        title (str): Header title. Defaults to the joined topic names.
+    
+    Returns:
+        tuple: (html_body, text_body) for email content.
+    """
+    title = title or ", ".join(topic for topic, _, _ in sections)
+    generated = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+    fragments = [_render_section(topic, summary, articles) for topic, summary, articles in sections]
+    
+    html_body = _HTML_SHELL.render(
+        topic=title, generated=generated, sections="".join(html for html, _ in fragments)
+    )
+    text_body = _TEXT_SHELL.render(
+        topic=title, generated=generated, sections="".join(text for _, text in fragments)
+    )
+    return html_body, text_body
+
+
+def create_email_body(summary: str, articles: List[Dict[str, str]], topic: str = None) -> tuple:
+    """
+    Create HTML and plain text email body.
+    
+    Args:
+        summary (str): The AI-generated summary with bullet points.
+        articles (List[Dict]): List of articles for links.
+        topic (str): Topic shown in the header. Defaults to NEWS_TOPIC from config.
+    
+    Returns:
+        tuple: (html_body, text_body) for email content.
     """
+    topic = topic or Config.NEWS_TOPIC
+    html_body, text_body = create_digest_body([("Key Highlights", summary, articles)], title=topic)
+    return html_body, text_body
+
+
+def _mime_message(subject: str, html_body: str, text_body: str, recipient: str) -> MIMEMultipart:
+    """Wrap rendered bodies in a multipart (plain text + HTML) message."""
+    message = MIMEMultipart("alternative")
+    message["Subject"] = subject
+    message["From"] = Config.EMAIL_SENDER
+    message["To"] = recipient
     
-    return html_body, text_body.strip()
+    # Attach both text and HTML versions
+    message.attach(MIMEText(text_body, "plain"))
+    message.attach(MIMEText(html_body, "html"))
+    return message
+
+
+def _build_message(subject: str, summary: str, articles: List[Dict[str, str]],
+                   recipient: str, topic: str = None) -> MIMEMultipart:
+    """Build the multipart (plain text + HTML) message for one recipient."""
+    html_body, text_body = create_email_body(summary, articles, topic)
+    return _mime_message(subject, html_body, text_body, recipient)
 
 
 def send_email(subject: str, summary: str, articles: List[Dict[str, str]], 
-               recipient: str = None) -> bool:
+               recipient: str = None, topic: str = None) -> bool:
     """
     Send formatted email with news summary.
     
@@ -103,38 +218,40 @@ def send_email(subject: str, summary: str, articles: List[Dict[str, str]],
         summary (str): The AI-generated summary.
         articles (List[Dict]): List of articles.
         recipient (str): Email recipient. Defaults to EMAIL_RECIPIENT from config.
+        topic (str): Topic shown in the email header. Defaults to NEWS_TOPIC from config.
     
     Returns:
         bool: True if email sent successfully, False otherwise.
     """
     
-    recipient = recipient or Config.EMAIL_RECIPIENT
-    
+    with metrics.timer("newsflash_stage_seconds", stage="email"):
+        sent = _send_email(subject, summary, articles, recipient or Config.EMAIL_RECIPIENT, topic)
+    metrics.inc("newsflash_upstream_requests_total", service="smtp", outcome="ok" if sent else "error")
+    return sent
+
+
+def _send_email(subject: str, summary: str, articles: List[Dict[str, str]],
+                recipient: str, topic: str = None) -> bool:
+    """Open one SMTP connection and send a single message (see send_email)."""
     try:
-        # Create email message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = Config.EMAIL_SENDER
-        message["To"] = recipient
-        
-        # Create email body
-        html_body, text_body = create_email_body(summary, articles)
-        
-        # Attach both text and HTML versions
-        message.attach(MIMEText(text_body, "plain"))
-        message.attach(MIMEText(html_body, "html"))
+        message = _build_message(subject, summary, articles, recipient, topic)
         
         print("📧 Connecting to email server...")
         
         # Connect to Gmail SMTP server
         with smtplib.SMTP(Config.SMTP_SERVER, Config.SMTP_PORT) as server:
-            server.starttls()  # Upgrade connection to secure
+            if Config.SMTP_STARTTLS:
+                server.starttls()  # Upgrade connection to secure
             
             print("🔐 Authenticating...")
             server.login(Config.EMAIL_SENDER, Config.EMAIL_PASSWORD)
             
             print(f"📤 Sending email to {recipient}...")
-            server.sendmail(Config.EMAIL_SENDER, recipient, message.as_string())
+            payload = message.as_string()
+            with metrics.timer("newsflash_upstream_seconds", service="smtp"):
+                server.sendmail(Config.EMAIL_SENDER, recipient, payload)
+            metrics.inc("newsflash_upstream_bytes_total", len(payload.encode("utf-8")),
+                        service="smtp", direction="sent")
         
         print("✓ Email sent successfully!")
         return True
@@ -155,6 +272,244 @@ def send_email(subject: str, summary: str, articles: List[Dict[str, str]],
         return False
 
 
+class _PooledConnection:
+    """One authenticated SMTP connection plus its send bookkeeping."""
+    
+    def __init__(self):
+        self.server: Optional[smtplib.SMTP] = None
+        self.sent = 0
+        self.last_send = 0.0
+    
+    def open(self) -> smtplib.SMTP:
+        if self.server is None:
+            server = smtplib.SMTP(Config.SMTP_SERVER, Config.SMTP_PORT, timeout=30)
+            if Config.SMTP_STARTTLS:
+                server.starttls()
+            server.login(Config.EMAIL_SENDER, Config.EMAIL_PASSWORD)
+            self.server, self.sent = server, 0
+        return self.server
+    
+    def close(self) -> None:
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+
+class BulkMailer:
+    """
+    Sends many messages over a small pool of authenticated SMTP connections
+    instead of one TLS handshake and login per message.
+    
+    Each connection is rate limited to SMTP_RATE_PER_CONNECTION messages per
+    second and recycled after SMTP_MAX_MESSAGES_PER_CONNECTION messages. A
+    dropped connection (421, disconnect, timeout, DNS or socket error) is
+    reopened and the message retried once; a message the server rejects for
+    one recipient keeps the connection. Safe to share between threads.
+    
+    Example:
+        with BulkMailer(connections=2) as mailer:
+            ok = mailer.send(subject, summary, articles, "user@example.com")
+    """
+    
+    def __init__(self, connections: int = None, rate_per_connection: float = None,
+                 max_messages_per_connection: int = None):
+        self.connections = max(1, connections or Config.SMTP_CONNECTIONS)
+        self.rate = rate_per_connection or Config.SMTP_RATE_PER_CONNECTION
+        self.max_messages = max_messages_per_connection or Config.SMTP_MAX_MESSAGES_PER_CONNECTION
+        self._pool: "queue.Queue[_PooledConnection]" = queue.Queue()
+        for _ in range(self.connections):
+            self._pool.put(_PooledConnection())
+    
+    def send(self, subject: str, summary: str, articles: List[Dict[str, str]],
+             recipient: str = None, topic: str = None) -> bool:
+        """Build and send one single-topic email; returns True if the server accepted it."""
+        return self.send_digest(subject, [(topic or Config.NEWS_TOPIC, summary, articles)],
+                                recipient, title=topic)
+    
+    def send_digest(self, subject: str, sections: List[Tuple[str, str, List[Dict[str, str]]]],
+                    recipient: str = None, title: str = None) -> bool:
+        """
+        Build and send a multi-topic digest from (topic, summary, articles) sections.
+        A single-section digest is headed with its own topic unless title is given.
+        """
+        recipient = recipient or Config.EMAIL_RECIPIENT
+        try:
+            if len(sections) == 1:
+                topic, summary, articles = sections[0]
+                html_body, text_body = create_email_body(summary, articles, title or topic)
+            else:
+                html_body, text_body = create_digest_body(sections, title)
+            message = _mime_message(subject, html_body, text_body, recipient)
+        except Exception as e:
+            print(f"✗ Error building email for {recipient}: {str(e)}")
+            return False
+        return self.send_message(message, recipient)
+    
+    def send_message(self, message: MIMEMultipart, recipient: str) -> bool:
+        """Send a prebuilt message over a pooled connection."""
+        sent = self._send_message(message, recipient)
+        metrics.inc("newsflash_upstream_requests_total", service="smtp", outcome="ok" if sent else "error")
+        return sent
+    
+    def _send_message(self, message: MIMEMultipart, recipient: str) -> bool:
+        conn = self._pool.get()
+        try:
+            for attempt in range(2):
+                try:
+                    self._throttle(conn)
+                    server = conn.open()
+                    payload = message.as_string()
+                    with metrics.timer("newsflash_upstream_seconds", service="smtp"):
+                        server.sendmail(Config.EMAIL_SENDER, recipient, payload)
+                    metrics.inc("newsflash_upstream_bytes_total", len(payload.encode("utf-8")),
+                                service="smtp", direction="sent")
+                    conn.sent += 1
+                    conn.last_send = time.monotonic()
+                    if conn.sent >= self.max_messages:
+                        conn.close()
+                    print(f"✓ Email sent to {recipient}")
+                    return True
+                except smtplib.SMTPAuthenticationError:
+                    print("✗ Authentication failed!")
+                    print("  → Check your EMAIL and EMAIL_PASSWORD in .env")
+                    conn.close()
+                    return False
+                except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError) as e:
+                    conn.close()
+                    if attempt == 0:
+                        print(f"  → SMTP connection lost ({str(e) or type(e).__name__}), reconnecting...")
+                        continue
+                    print(f"✗ SMTP error sending to {recipient}: {str(e)}")
+                    return False
+                except smtplib.SMTPResponseException as e:
+                    if e.smtp_code == 421:
+                        conn.close()
+                        if attempt == 0:
+                            print("  → SMTP server closing connection (421), reconnecting...")
+                            continue
+                    # Other codes reject this message only; sendmail already RSET the session
+                    print(f"✗ SMTP error sending to {recipient}: {e.smtp_code} {e.smtp_error!r}")
+                    return False
+                except smtplib.SMTPException as e:
+                    print(f"✗ SMTP error sending to {recipient}: {str(e)}")
+                    return False
+                except OSError as e:
+                    # DNS failures, refused/reset connections and timeouts (after the SMTP
+                    # errors above, which subclass OSError)
+                    conn.close()
+                    if attempt == 0:
+                        print(f"  → SMTP connection failed ({str(e) or type(e).__name__}), reconnecting...")
+                        continue
+                    print(f"✗ SMTP error sending to {recipient}: {str(e) or type(e).__name__}")
+                    return False
+            return False
+        finally:
+            self._pool.put(conn)
+    
+    def send_many(self, messages: Iterable[Tuple[str, str, List[Dict[str, str]], str]]) -> Dict[str, bool]:
+        """Send (subject, summary, articles, recipient) tuples; returns result per recipient."""
+        return {recipient: self.send(subject, summary, articles, recipient)
+                for subject, summary, articles, recipient in messages}
+    
+    def close_idle(self, max_idle: float) -> None:
+        """Quit connections that have not sent anything for max_idle seconds."""
+        now = time.monotonic()
+        for _ in range(self.connections):
+            conn = self._pool.get()
+            if conn.server is not None and now - conn.last_send >= max_idle:
+                conn.close()
+            self._pool.put(conn)
+    
+    def close(self) -> None:
+        """Quit every open connection."""
+        for _ in range(self.connections):
+            conn = self._pool.get()
+            conn.close()
+            self._pool.put(conn)
+    
+    def __enter__(self) -> "BulkMailer":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    def _throttle(self, conn: _PooledConnection) -> None:
+        if self.rate <= 0:
+            return
+        wait = conn.last_send + 1.0 / self.rate - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+
+def send_emails_bulk(messages: Iterable[Tuple[str, str, List[Dict[str, str]], str]],
+                     connections: int = None) -> Dict[str, bool]:
+    """
+    Send many digests over reused SMTP connections.
+    
+    Args:
+        messages: Iterable of (subject, summary, articles, recipient) tuples.
+        connections (int): Pool size. Defaults to SMTP_CONNECTIONS from config.
+    
+    Returns:
+        Dict[str, bool]: True/False per recipient.
+    """
+    with BulkMailer(connections=connections) as mailer:
+        return mailer.send_many(messages)
+
+
+async def asend_email(subject: str, summary: str, articles: List[Dict[str, str]],
+                      recipient: str = None, topic: str = None) -> bool:
+    """
+    Async counterpart of send_email using aiosmtplib.
+    
+    Returns:
+        bool: True if email sent successfully, False otherwise.
+    """
+    import aiosmtplib
+    
+    recipient = recipient or Config.EMAIL_RECIPIENT
+    
+    try:
+        message = _build_message(subject, summary, articles, recipient, topic)
+        
+        print(f"📤 Sending email to {recipient}...")
+        with metrics.timer("newsflash_upstream_seconds", service="smtp"):
+            await aiosmtplib.send(
+                message,
+                hostname=Config.SMTP_SERVER,
+                port=Config.SMTP_PORT,
+                start_tls=Config.SMTP_STARTTLS,
+                username=Config.EMAIL_SENDER,
+                password=Config.EMAIL_PASSWORD,
+                timeout=30,
+            )
+        metrics.inc("newsflash_upstream_requests_total", service="smtp", outcome="ok")
+        metrics.inc("newsflash_upstream_bytes_total", len(message.as_string().encode("utf-8")),
+                    service="smtp", direction="sent")
+        
+        print("✓ Email sent successfully!")
+        return True
+    
+    except aiosmtplib.SMTPAuthenticationError:
+        metrics.inc("newsflash_upstream_requests_total", service="smtp", outcome="error")
+        print("✗ Authentication failed!")
+        print("  → Check your EMAIL and EMAIL_PASSWORD in .env")
+        print("  → For Gmail: Use an App Password, not your regular password")
+        return False
+    
+    except aiosmtplib.SMTPException as e:
+        metrics.inc("newsflash_upstream_requests_total", service="smtp", outcome="error")
+        print(f"✗ SMTP error: {str(e)}")
+        return False
+    
+    except Exception as e:
+        print(f"✗ Error sending email: {str(e)}")
+        return False
+
+
 if __name__ == "__main__":
     # Test email functionality
     from fetch_news import fetch_news
@@ -172,7 +527,8 @@ if __name__ == "__main__":
         send_email(
             subject="🗞️ News-Flash | Indian Startups",
             summary=summary,
-            articles=articles
+            articles=articles,
+            topic="Indian Startups"
         )
     else:
         print("No articles to send.")
@@ -1,80 +1,363 @@
 """
 Phase 1: Fetch Latest News
 This module handles fetching news articles from NewsAPI.
+Large requests are paged with iter_news, which streams articles lazily.
 """
 
-import requests
-from typing import List, Dict
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterator, List, Dict, Optional, Tuple
+import metrics
+from article import Article, as_articles
 from config import Config
+from dedup import canonical_url, dedup_articles
+from singleflight import get_flight
 
+if TYPE_CHECKING:
+    import requests
 
-def fetch_news(topic: str = None, max_articles: int = None) -> List[Dict[str, str]]:
+# Shared keep-alive session (created on first use; requests is imported then too)
+_session: Optional["requests.Session"] = None
+_session_lock = threading.Lock()
+
+# ETag / Last-Modified validators and last payload per query, for revalidation
+_MAX_VALIDATORS = 256
+_validators: "OrderedDict[tuple, dict]" = OrderedDict()
+_validators_lock = threading.Lock()
+
+# Shared async HTTP client, bound to the event loop that created it
+_async_client = None
+_async_client_loop = None
+
+
+class NewsFetchError(Exception):
+    """NewsAPI could not be reached or answered with an error (as opposed to no articles)."""
+
+
+def topic_key(topic: str) -> str:
+    """
+    Normalize a topic so "AI", " ai" and "Ai" are one topic. Every cache,
+    single-flight and planner key built from a topic goes through this.
+    """
+    return " ".join((topic or "").split()).lower()
+
+
+def get_session() -> "requests.Session":
+    """
+    Return the process-wide pooled HTTP session for NewsAPI.
+
+    The session keeps connections alive between calls and retries transient
+    failures (429 and 5xx) with exponential backoff, honouring Retry-After
+    up to NEWS_API_BACKOFF_MAX seconds.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                
+                class CappedRetry(Retry):
+                    """Retry whose waits, Retry-After included, never exceed NEWS_API_BACKOFF_MAX."""
+                    
+                    def parse_retry_after(self, retry_after: str) -> float:
+                        return min(super().parse_retry_after(retry_after), Config.NEWS_API_BACKOFF_MAX)
+                    
+                    def get_backoff_time(self) -> float:
+                        return min(super().get_backoff_time(), Config.NEWS_API_BACKOFF_MAX)
+                
+                retry = CappedRetry(
+                    total=Config.NEWS_API_RETRIES,
+                    backoff_factor=Config.NEWS_API_BACKOFF,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET"]),
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=Config.NEWS_API_POOL_SIZE,
+                    pool_maxsize=Config.NEWS_API_POOL_SIZE,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _conditional_get(params: dict) -> dict:
+    """
+    GET the NewsAPI endpoint, revalidating with If-None-Match/If-Modified-Since
+    when a previous response for the same query carried validators.
+
+    Returns:
+        dict: Parsed JSON payload (the cached one on 304 Not Modified).
+    """
+    key = tuple(sorted((k, str(v)) for k, v in params.items() if k != "apiKey"))
+    headers = {}
+    with _validators_lock:
+        cached = _validators.get(key)
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        with metrics.timer("newsflash_upstream_seconds", service="newsapi"):
+            response = get_session().get(Config.NEWS_API_URL, params=params, headers=headers, timeout=10)
+    except Exception:
+        metrics.inc("newsflash_upstream_requests_total", service="newsapi", outcome="error")
+        raise
+    metrics.inc("newsflash_upstream_bytes_total", len(response.content), service="newsapi", direction="received")
+    if response.status_code == 304 and cached:
+        metrics.inc("newsflash_upstream_requests_total", service="newsapi", outcome="not_modified")
+        return cached["data"]
+    metrics.inc("newsflash_upstream_requests_total", service="newsapi",
+                outcome="ok" if response.ok else "error")
+    response.raise_for_status()  # Raise exception for bad status codes
+
+    data = response.json()
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if (etag or last_modified) and data.get("status") == "ok":
+        with _validators_lock:
+            _validators[key] = {"etag": etag, "last_modified": last_modified, "data": data}
+            _validators.move_to_end(key)
+            while len(_validators) > _MAX_VALIDATORS:
+                _validators.popitem(last=False)
+    return data
+
+
+def fetch_news(topic: str = None, max_articles: int = None, since: str = None,
+               raise_errors: bool = False) -> List[Article]:
     """
     Fetch latest news articles for a given topic from NewsAPI.
     
     Args:
         topic (str): The news topic to search for. Defaults to NEWS_TOPIC from config.
         max_articles (int): Maximum number of articles to fetch. Defaults to MAX_ARTICLES from config.
+        since (str): Only articles published at or after this ISO 8601 time (NewsAPI "from").
+        raise_errors (bool): Raise NewsFetchError when the request fails instead of
+            returning an empty list, so callers can tell an outage from "no news".
     
     Returns:
-        List[Dict]: List of articles with keys: title, description, url, source
+        List[Article]: Articles with keys: title, description, url, source, publishedAt
+            (and "duplicates" when copies of the same story were merged into it)
     
     Raises:
-        requests.exceptions.RequestException: If API request fails.
-        ValueError: If API response contains an error.
+        NewsFetchError: If the request fails and raise_errors is set.
     """
     
     topic = topic or Config.NEWS_TOPIC
     max_articles = max_articles or Config.MAX_ARTICLES
     
-    # Prepare request parameters
+    # Identical concurrent fetches (threads or processes) share one request
+    key = f"fetch:{topic_key(topic)}|{max_articles}|{since or ''}"
+    with metrics.timer("newsflash_stage_seconds", stage="fetch"):
+        try:
+            # Results shared by another process arrive in their JSON (dict) form
+            return as_articles(get_flight().do(key, lambda: _fetch_news(topic, max_articles, since)))
+        except NewsFetchError:
+            if raise_errors:
+                raise
+            return []
+
+
+def _fetch_news(topic: str, max_articles: int, since: str = None) -> List[Article]:
+    """Fetch up to max_articles articles, one or more pages; raises NewsFetchError on failure."""
+    import requests
+    
+    try:
+        print(f"📡 Fetching news for: {topic}...")
+        cleaned_articles = list(iter_news(topic, max_articles, since))
+        
+        if not cleaned_articles:
+            print(f"⚠️  No articles found for topic: {topic}")
+            return []
+        
+        print(f"✓ Successfully fetched {len(cleaned_articles)} articles")
+        cleaned_articles = _dedup(cleaned_articles)
+        return cleaned_articles
+    
+    except requests.exceptions.Timeout as e:
+        print("✗ Error: Request timeout. Check your internet connection.")
+        raise NewsFetchError("NewsAPI request timed out") from e
+    except requests.exceptions.ConnectionError as e:
+        print("✗ Error: Connection failed. Check your internet connection.")
+        raise NewsFetchError("NewsAPI connection failed") from e
+    except requests.exceptions.HTTPError as e:
+        print(f"✗ HTTP Error: {e.response.status_code}")
+        if e.response.status_code == 401:
+            print("  → Invalid API key. Please check your NEWS_API_KEY in .env")
+        elif e.response.status_code == 429:
+            print("  → Rate limit exceeded. Please try again later.")
+        raise NewsFetchError(f"NewsAPI HTTP {e.response.status_code}") from e
+    except Exception as e:
+        print(f"✗ Unexpected error: {str(e)}")
+        raise NewsFetchError(str(e) or type(e).__name__) from e
+
+
+def iter_news(topic: str = None, limit: int = None, since: str = None) -> Iterator[Article]:
+    """
+    Stream cleaned articles for a topic, one NewsAPI page at a time.
+    
+    NewsAPI caps pageSize (NEWS_API_PAGE_SIZE), so larger limits are read
+    page by page. The next page is requested in the background while the
+    caller works through the current one, so at most two pages are held in
+    memory. Articles repeated on a later page (results shift when new stories
+    arrive mid-scan) are skipped.
+    
+    Args:
+        topic (str): The news topic to search for. Defaults to NEWS_TOPIC from config.
+        limit (int): Maximum number of articles to yield. Defaults to MAX_ARTICLES from config.
+        since (str): Only articles published at or after this ISO 8601 time (NewsAPI "from").
+    
+    Yields:
+        Article: With keys: title, description, url, source, publishedAt
+    
+    Raises:
+        requests.exceptions.RequestException: If a page request fails.
+        ValueError: If API response contains an error.
+    """
+    topic = topic or Config.NEWS_TOPIC
+    limit = limit or Config.MAX_ARTICLES
+    page_size = max(1, min(limit, Config.NEWS_API_PAGE_SIZE))
+    pages = math.ceil(limit / page_size)
+    
     params = {
         "q": topic,
         "sortBy": "publishedAt",
         "language": "en",
-        "pageSize": max_articles,
+        "pageSize": page_size,
         "apiKey": Config.NEWS_API_KEY
     }
+    if since:
+        params["from"] = since
     
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="news-prefetch")
+    seen = set()
+    yielded = 0
+    try:
+        pending = executor.submit(_get_page, params, 1)
+        for page in range(1, pages + 1):
+            articles, total = pending.result()
+            has_next = page < pages and len(articles) == page_size and page * page_size < total
+            if has_next:
+                pending = executor.submit(_get_page, params, page + 1)
+            
+            for article in _clean_articles(articles):
+                url = canonical_url(article["url"])
+                if url and url in seen:
+                    continue
+                seen.add(url)
+                yield article
+                yielded += 1
+                if yielded >= limit:
+                    return
+            
+            if not has_next:
+                return
+    finally:
+        # A consumer that stops early must not leave a page request running
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_page(params: dict, page: int) -> Tuple[List[dict], int]:
+    """Request one page; returns (raw articles, totalResults)."""
+    data = _conditional_get({**params, "page": page} if page > 1 else params)
+    
+    # Check for API errors
+    if data.get("status") != "ok":
+        raise ValueError(f"NewsAPI error: {data.get('message', 'Unknown error')}")
+    
+    return data.get("articles") or [], int(data.get("totalResults") or 0)
+
+
+def _get_async_client():
+    """Return the pooled httpx.AsyncClient for the running event loop."""
+    global _async_client, _async_client_loop
+    import asyncio
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        limits = httpx.Limits(
+            max_connections=Config.NEWS_API_POOL_SIZE,
+            max_keepalive_connections=Config.NEWS_API_POOL_SIZE,
+        )
+        _async_client = httpx.AsyncClient(timeout=10, limits=limits)
+        _async_client_loop = loop
+    return _async_client
+
+
+async def afetch_news(topic: str = None, max_articles: int = None, since: str = None) -> List[Article]:
+    """
+    Async counterpart of fetch_news built on a pooled httpx.AsyncClient.
+
+    Retries 429 and 5xx responses with exponential backoff, honouring
+    Retry-After up to NEWS_API_BACKOFF_MAX, and returns an empty list on failure like fetch_news.
+    Large requests are paged like iter_news, prefetching the next page.
+    """
+    import asyncio
+    import httpx
+
+    topic = topic or Config.NEWS_TOPIC
+    max_articles = max_articles or Config.MAX_ARTICLES
+    page_size = max(1, min(max_articles, Config.NEWS_API_PAGE_SIZE))
+    pages = math.ceil(max_articles / page_size)
+
+    params = {
+        "q": topic,
+        "sortBy": "publishedAt",
+        "language": "en",
+        "pageSize": page_size,
+        "apiKey": Config.NEWS_API_KEY
+    }
+    if since:
+        params["from"] = since
+
+    pending = None
     try:
         print(f"📡 Fetching news for: {topic}...")
-        response = requests.get(Config.NEWS_API_URL, params=params, timeout=10)
-        response.raise_for_status()  # Raise exception for bad status codes
-        
-        data = response.json()
-        
-        # Check for API errors
-        if data.get("status") != "ok":
-            raise ValueError(f"NewsAPI error: {data.get('message', 'Unknown error')}")
-        
-        articles = data.get("articles", [])
-        
-        if not articles:
+        client = _get_async_client()
+        cleaned_articles = []
+        seen = set()
+        pending = asyncio.ensure_future(_aget_page(client, params, 1))
+        for page in range(1, pages + 1):
+            articles, total = await pending
+            pending = None
+            has_next = page < pages and len(articles) == page_size and page * page_size < total
+            if has_next:
+                pending = asyncio.ensure_future(_aget_page(client, params, page + 1))
+            for article in _clean_articles(articles):
+                url = canonical_url(article["url"])
+                if not (url and url in seen):
+                    seen.add(url)
+                    cleaned_articles.append(article)
+            if not has_next:
+                break
+        cleaned_articles = cleaned_articles[:max_articles]
+
+        if not cleaned_articles:
             print(f"⚠️  No articles found for topic: {topic}")
             return []
-        
-        # Clean and structure articles
-        cleaned_articles = []
-        for article in articles:
-            cleaned_article = {
-                "title": article.get("title", "N/A"),
-                "description": article.get("description", "N/A"),
-                "url": article.get("url", "#"),
-                "source": article.get("source", {}).get("name", "Unknown"),
-                "publishedAt": article.get("publishedAt", "N/A")
-            }
-            cleaned_articles.append(cleaned_article)
-        
+
         print(f"✓ Successfully fetched {len(cleaned_articles)} articles")
+        cleaned_articles = _dedup(cleaned_articles)
         return cleaned_articles
-    
-    except requests.exceptions.Timeout:
+
+    except httpx.TimeoutException:
         print("✗ Error: Request timeout. Check your internet connection.")
         return []
-    except requests.exceptions.ConnectionError:
+    except httpx.TransportError:
         print("✗ Error: Connection failed. Check your internet connection.")
         return []
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         print(f"✗ HTTP Error: {e.response.status_code}")
         if e.response.status_code == 401:
             print("  → Invalid API key. Please check your NEWS_API_KEY in .env")
@@ -84,6 +367,55 @@ def fetch_news(topic: str = None, max_articles: int = None) -> List[Dict[str, st
     except Exception as e:
         print(f"✗ Unexpected error: {str(e)}")
         return []
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def _aget_page(client, params: dict, page: int) -> Tuple[List[dict], int]:
+    """Request one page with retries; returns (raw articles, totalResults)."""
+    import asyncio
+
+    params = {**params, "page": page} if page > 1 else params
+    for attempt in range(Config.NEWS_API_RETRIES + 1):
+        try:
+            with metrics.timer("newsflash_upstream_seconds", service="newsapi"):
+                response = await client.get(Config.NEWS_API_URL, params=params)
+        except Exception:
+            metrics.inc("newsflash_upstream_requests_total", service="newsapi", outcome="error")
+            raise
+        metrics.inc("newsflash_upstream_requests_total", service="newsapi",
+                    outcome="ok" if response.is_success else "error")
+        metrics.inc("newsflash_upstream_bytes_total", len(response.content),
+                    service="newsapi", direction="received")
+        if response.status_code not in (429, 500, 502, 503, 504) or attempt == Config.NEWS_API_RETRIES:
+            break
+        retry_after = response.headers.get("Retry-After", "")
+        delay = float(retry_after) if retry_after.isdigit() else Config.NEWS_API_BACKOFF * (2 ** attempt)
+        await asyncio.sleep(min(delay, Config.NEWS_API_BACKOFF_MAX))
+    response.raise_for_status()
+
+    data = response.json()
+
+    if data.get("status") != "ok":
+        raise ValueError(f"NewsAPI error: {data.get('message', 'Unknown error')}")
+
+    return data.get("articles") or [], int(data.get("totalResults") or 0)
+
+
+def _clean_articles(articles: List[dict]) -> List[Article]:
+    """Reduce raw NewsAPI articles to the fields the pipeline uses."""
+    return [Article.from_newsapi(article) for article in articles]
+
+
+def _dedup(articles: List[Article]) -> List[Article]:
+    """Collapse duplicate stories so later stages see each story once."""
+    if not Config.DEDUP_ENABLED:
+        return articles
+    deduped = dedup_articles(articles)
+    if len(deduped) < len(articles):
+        print(f"  → Merged {len(articles) - len(deduped)} duplicate articles into {len(deduped)} stories")
+    return deduped
 
 
 def print_articles(articles: List[Dict[str, str]]) -> None:
@@ -3,13 +3,20 @@ Phase 4 & Main Entry Point: News-Flash
 Complete pipeline: Fetch → Summarize → Email
 """
 
+import os
 import sys
 import argparse
+import threading
+import time
 from datetime import datetime
+from typing import Dict, List, Tuple
+import metrics
 from config import Config
-from fetch_news import fetch_news
-from summarize import summarize_news
-from emailer import send_email
+from fetch_news import fetch_news, afetch_news, topic_key
+from summarize import summarize_news, asummarize_news
+from emailer import send_email, asend_email, BulkMailer
+from pipeline import Many, StagedPipeline
+from topic_cache import TopicCache
 
 
 def run_pipeline(topic: str = None, send_email_flag: bool = True, 
@@ -74,7 +81,7 @@ def run_pipeline(topic: str = None, send_email_flag: bool = True,
             print("-" * 60)
             
             subject = f"🗞️ News-Flash | {topic}"
-            success = send_email(subject, summary, articles, recipient)
+            success = send_email(subject, summary, articles, recipient, topic=topic)
             
             if success:
                 print(f"\n✓ Phase 3 Complete: Email sent to {recipient}\n")
@@ -98,6 +105,254 @@ def run_pipeline(topic: str = None, send_email_flag: bool = True,
         return False
 
 
+def run_pipelines(topics: List[str], send_email_flag: bool = True,
+                  recipients: Dict[str, List[str]] = None, max_articles: int = None,
+                  workers: int = None) -> Dict[str, dict]:
+    """
+    Run the pipeline for many topics in one process.
+    
+    Fetch, summarize and send run as parallel stages. Articles and summaries
+    are shared through one TopicCache, and every email goes over one pool of
+    SMTP connections, so startup, TLS and login are paid once per run instead
+    of once per topic.
+    
+    Args:
+        topics (List[str]): News topics to run.
+        send_email_flag (bool): Whether to send email. Default is True.
+        recipients (Dict[str, List[str]]): Recipients per topic. Topics without
+            an entry go to EMAIL_RECIPIENT from config.
+        max_articles (int): Maximum articles per topic. Defaults to MAX_ARTICLES from config.
+        workers (int): Workers per stage and SMTP pool size. Defaults to FETCH_WORKERS /
+            SUMMARIZE_WORKERS / SMTP_WORKERS, and SMTP_CONNECTIONS for the pool.
+    
+    Returns:
+        Dict[str, dict]: Per topic: status, article count, emails sent and stage timings.
+    """
+    max_articles = max_articles or Config.MAX_ARTICLES
+    recipients = recipients or {}
+    cache = TopicCache()
+    lock = threading.Lock()
+    results: Dict[str, dict] = {
+        topic: {
+            "status": "error", "articles": 0, "sent": 0,
+            "recipients": recipients.get(topic) or [Config.EMAIL_RECIPIENT],
+            "fetch_s": 0.0, "summarize_s": 0.0, "email_s": 0.0,
+        }
+        for topic in topics
+    }
+    
+    def fetch(topic: str):
+        started = time.perf_counter()
+        articles = cache.get_articles(topic, max_articles)
+        results[topic]["fetch_s"] = time.perf_counter() - started
+        results[topic]["articles"] = len(articles)
+        if not articles:
+            results[topic]["status"] = "no articles"
+            return None
+        return topic, articles
+    
+    def summarize(job: Tuple[str, List[Dict[str, str]]]):
+        topic, articles = job
+        started = time.perf_counter()
+        summary = cache.get_summary(topic, max_articles, articles)
+        results[topic]["summarize_s"] = time.perf_counter() - started
+        if not summary or summary == "No articles to summarize.":
+            results[topic]["status"] = "summary failed"
+            return None
+        results[topic]["status"] = "ok"
+        if not send_email_flag:
+            return None
+        return Many((topic, summary, articles, recipient) for recipient in results[topic]["recipients"])
+    
+    def send(job: Tuple[str, str, List[Dict[str, str]], str]):
+        topic, summary, articles, recipient = job
+        started = time.perf_counter()
+        sent = mailer.send(f"🗞️ News-Flash | {topic}", summary, articles, recipient, topic=topic)
+        with lock:
+            results[topic]["email_s"] += time.perf_counter() - started
+            results[topic]["sent"] += int(sent)
+        return job
+    
+    cache.plan((topic, max_articles) for topic in topics)
+    with BulkMailer(connections=workers or Config.SMTP_CONNECTIONS) as mailer:
+        pipeline = StagedPipeline([
+            ("fetch", fetch, workers or Config.FETCH_WORKERS),
+            ("summarize", summarize, workers or Config.SUMMARIZE_WORKERS),
+            ("send", send, workers or Config.SMTP_WORKERS),
+        ])
+        pipeline.run(topics)
+    
+    for result in results.values():
+        if send_email_flag and result["status"] == "ok" and result["sent"] < len(result["recipients"]):
+            result["status"] = "email failed"
+    
+    cache.save()
+    print(f"\n{pipeline.report()}")
+    print(cache.report())
+    return results
+
+
+def print_run_summary(results: Dict[str, dict]) -> None:
+    """Print a per-topic status and timing table for a multi-topic run."""
+    width = max([len("Topic")] + [len(topic) for topic in results])
+    print("\n" + "=" * 60)
+    print("📊 RUN SUMMARY")
+    print("=" * 60)
+    print(f"{'Topic':<{width}}  {'Status':<14} {'Articles':>8} {'Sent':>7} "
+          f"{'Fetch':>7} {'Summ.':>7} {'Email':>7}")
+    for topic, r in results.items():
+        sent = f"{r['sent']}/{len(r['recipients'])}"
+        print(f"{topic:<{width}}  {r['status']:<14} {r['articles']:>8} {sent:>7} "
+              f"{r['fetch_s']:>6.2f}s {r['summarize_s']:>6.2f}s {r['email_s']:>6.2f}s")
+    ok = sum(1 for r in results.values() if r["status"] == "ok")
+    print("-" * 60)
+    print(f"{'✅' if ok == len(results) else '⚠️ '} {ok}/{len(results)} topics completed")
+    print("=" * 60 + "\n")
+
+
+def _read_list(path: str) -> List[str]:
+    """Non-empty, non-comment lines of a text file."""
+    with open(path, "r", encoding="utf-8") as fh:
+        return [line.strip() for line in fh if line.strip() and not line.lstrip().startswith("#")]
+
+
+def load_topics(values: List[str]) -> List[str]:
+    """
+    Expand --topics values: each value is a topic, or a file with one topic per line.
+    Duplicates (ignoring case and spacing) are dropped, keeping the first spelling.
+    """
+    topics: List[str] = []
+    seen = set()
+    for value in values:
+        for topic in (_read_list(value) if os.path.isfile(value) else [value]):
+            key = topic_key(topic)
+            if key not in seen:
+                seen.add(key)
+                topics.append(topic)
+    return topics
+
+
+def load_recipients(path: str, topics: List[str]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Read a recipients file with one recipient per line::
+    
+        ops@example.com                  # receives every topic
+        cto@example.com: AI, Tesla News  # receives only these topics
+    
+    Topics named in the file but missing from `topics` are added to the run.
+    
+    Returns:
+        tuple: (topics to run, recipients per topic)
+    """
+    topics = list(topics)
+    everyone: List[str] = []
+    chosen: List[Tuple[str, List[str]]] = []
+    for line in _read_list(path):
+        line = line.split("#", 1)[0].strip()
+        address, _, wanted = line.partition(":")
+        wanted_topics = [t.strip() for t in wanted.split(",") if t.strip()]
+        if wanted_topics:
+            chosen.append((address.strip(), wanted_topics))
+            topics = load_topics(topics + wanted_topics)
+        elif address.strip():
+            everyone.append(address.strip())
+    
+    if not topics:
+        topics = [Config.NEWS_TOPIC]
+    keys = {topic_key(t): t for t in topics}
+    recipients: Dict[str, List[str]] = {topic: list(everyone) for topic in topics}
+    for address, wanted_topics in chosen:
+        for wanted in wanted_topics:
+            topic = keys[topic_key(wanted)]
+            if address not in recipients[topic]:
+                recipients[topic].append(address)
+    return topics, recipients
+
+
+class UpstreamLimits:
+    """
+    One semaphore per upstream service for the async pipeline, so hundreds of
+    concurrent topics never exceed NewsAPI, LLM or SMTP concurrency limits.
+    Must be created inside the running event loop.
+    """
+    
+    def __init__(self, news: int = None, llm: int = None, smtp: int = None):
+        import asyncio
+        self.news = asyncio.Semaphore(news or Config.NEWS_API_CONCURRENCY)
+        self.llm = asyncio.Semaphore(llm or Config.LLM_CONCURRENCY)
+        self.smtp = asyncio.Semaphore(smtp or Config.SMTP_CONCURRENCY)
+
+
+async def arun_pipeline(topic: str = None, send_email_flag: bool = True,
+                        recipient: str = None, max_articles: int = None,
+                        limits: UpstreamLimits = None) -> bool:
+    """
+    Async counterpart of run_pipeline: fetch → summarize → email for one topic
+    on the running event loop, with each upstream call gated by its semaphore.
+    
+    Args:
+        topic (str): News topic to search. Defaults to NEWS_TOPIC from config.
+        send_email_flag (bool): Whether to send email. Default is True.
+        recipient (str): Email recipient. Defaults to EMAIL_RECIPIENT from config.
+        max_articles (int): Maximum articles to fetch. Defaults to MAX_ARTICLES from config.
+        limits (UpstreamLimits): Shared per-service semaphores. Created if omitted.
+    
+    Returns:
+        bool: True if pipeline completed successfully, False otherwise.
+    """
+    
+    topic = topic or Config.NEWS_TOPIC
+    max_articles = max_articles or Config.MAX_ARTICLES
+    recipient = recipient or Config.EMAIL_RECIPIENT
+    limits = limits or UpstreamLimits()
+    
+    try:
+        async with limits.news:
+            articles = await afetch_news(topic=topic, max_articles=max_articles)
+        
+        if not articles:
+            print(f"✗ [{topic}] Pipeline failed: No articles found.")
+            return False
+        
+        async with limits.llm:
+            summary = await asummarize_news(articles)
+        
+        if not summary or summary == "No articles to summarize.":
+            print(f"✗ [{topic}] Pipeline failed: Summary generation failed.")
+            return False
+        
+        if send_email_flag:
+            async with limits.smtp:
+                success = await asend_email(f"🗞️ News-Flash | {topic}", summary, articles, recipient, topic)
+            if not success:
+                print(f"✗ [{topic}] Email not sent")
+                return False
+        
+        print(f"✅ [{topic}] Pipeline completed")
+        return True
+    
+    except Exception as e:
+        print(f"✗ [{topic}] PIPELINE ERROR: {str(e)}")
+        return False
+
+
+async def arun_pipelines(topics: List[str], send_email_flag: bool = True,
+                         recipient: str = None, max_articles: int = None) -> Dict[str, bool]:
+    """
+    Run the async pipeline for many topics concurrently on one event loop.
+    
+    Returns:
+        Dict[str, bool]: Success flag per topic.
+    """
+    import asyncio
+    limits = UpstreamLimits()
+    results = await asyncio.gather(*(
+        arun_pipeline(topic, send_email_flag, recipient, max_articles, limits)
+        for topic in topics
+    ))
+    return dict(zip(topics, results))
+
+
 def main():
     """Command-line entry point for News-Flash."""
     
@@ -117,6 +372,13 @@ Examples:
   
   # Run with custom recipient
   python main.py --recipient custom@example.com
+  
+  # Write a JSON report of stage timings, upstream calls and tokens
+  python main.py --no-email --metrics-json run.json
+  
+  # Run many topics in one process (topics may also come from a file)
+  python main.py --topics "AI" "Tesla News" --workers 4
+  python main.py --topics topics.txt --recipients-file recipients.txt
         """
     )
     
@@ -126,6 +388,25 @@ Examples:
         help="News topic to search (default: from .env)"
     )
     
+    parser.add_argument(
+        "--topics",
+        nargs="+",
+        metavar="TOPIC_OR_FILE",
+        help="Run several topics in one process; a value naming a file is read as one topic per line"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Parallel workers per stage for --topics runs (default: from .env)"
+    )
+    
+    parser.add_argument(
+        "--recipients-file",
+        metavar="PATH",
+        help="Recipients for --topics runs, one per line; 'email: topic, topic' limits a recipient to those topics"
+    )
+    
     parser.add_argument(
         "--no-email",
         action="store_true",
@@ -144,6 +425,12 @@ Examples:
         help="Maximum articles to fetch (default: 10)"
     )
     
+    parser.add_argument(
+        "--metrics-json",
+        metavar="PATH",
+        help="Write a JSON run report (stage latencies, upstream calls, cache hits, tokens); - for stdout"
+    )
+    
     args = parser.parse_args()
     
     try:
@@ -155,12 +442,40 @@ Examples:
         sys.exit(1)
     
     # Run the pipeline
-    success = run_pipeline(
-        topic=args.topic,
-        send_email_flag=not args.no_email,
-        recipient=args.recipient,
-        max_articles=args.max_articles
-    )
+    if args.topics or args.recipients_file:
+        try:
+            topics = load_topics(args.topics or ([args.topic] if args.topic else []))
+            recipients = {}
+            if args.recipients_file:
+                topics, recipients = load_recipients(args.recipients_file, topics)
+            elif args.recipient:
+                recipients = {topic: [args.recipient] for topic in topics}
+        except OSError as e:
+            print(f"❌ Could not read input file: {e}")
+            sys.exit(1)
+        
+        print(f"\n🚀 NEWS-FLASH: {len(topics)} topics, {args.workers or 'default'} workers per stage")
+        with metrics.timer("newsflash_stage_seconds", stage="pipeline"):
+            results = run_pipelines(
+                topics,
+                send_email_flag=not args.no_email,
+                recipients=recipients,
+                max_articles=args.max_articles,
+                workers=args.workers
+            )
+        print_run_summary(results)
+        success = all(r["status"] == "ok" for r in results.values())
+    else:
+        with metrics.timer("newsflash_stage_seconds", stage="pipeline"):
+            success = run_pipeline(
+                topic=args.topic,
+                send_email_flag=not args.no_email,
+                recipient=args.recipient,
+                max_articles=args.max_articles
+            )
+    
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json)
     
     sys.exit(0 if success else 1)
 
@@ -0,0 +1,202 @@
+"""
+Pipeline Metrics for News-Flash
+Process-wide counters and latency histograms for fetch, summarize, email and
+the scheduler, exported as Prometheus text (web app /metrics) or as a JSON
+run report (CLI --metrics-json).
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Latency buckets in seconds, from cache hits up to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_HELP = {
+    "newsflash_stage_seconds": "Latency of pipeline stages (fetch, summarize, email, scheduler).",
+    "newsflash_pipeline_item_seconds": "Time spent on one item in a scheduler pipeline stage.",
+    "newsflash_upstream_seconds": "Latency of single upstream calls (NewsAPI, LLM, SMTP).",
+    "newsflash_upstream_requests_total": "Calls to upstream services by outcome.",
+    "newsflash_upstream_bytes_total": "Bytes exchanged with upstream services.",
+    "newsflash_cache_requests_total": "Cache lookups by cache and result.",
+    "newsflash_llm_tokens_total": "Tokens reported by the LLM provider.",
+    "newsflash_prompts_total": "Summarization prompts sent to the LLM.",
+    "newsflash_prompt_tokens_total": "Prompt tokens sent, counted locally before the call.",
+    "newsflash_prompt_articles_total": "Articles offered to the prompt builder, by outcome (kept, truncated, dropped).",
+    "newsflash_fallback_summaries_total": "Summaries produced locally because the LLM call failed.",
+    "newsflash_send_jobs_total": "Scheduled send jobs finished, by status.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (inf past the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of labelled counters and histograms.
+
+    Example:
+        metrics.inc("newsflash_upstream_requests_total", service="newsapi", outcome="ok")
+        with metrics.timer("newsflash_stage_seconds", stage="fetch"):
+            articles = fetch_news(topic)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str):
+        """Observe the duration of the block in seconds (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> dict:
+        """Plain-dict view for JSON run reports, with cache hit ratios derived."""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in sorted(series.items())]
+                for name, series in sorted(self._counters.items())
+            }
+            histograms = {
+                name: [{
+                    "labels": dict(key),
+                    "count": hist.count,
+                    "sum": round(hist.sum, 6),
+                    "p50": _finite(hist.quantile(0.5)),
+                    "p95": _finite(hist.quantile(0.95)),
+                    "p99": _finite(hist.quantile(0.99)),
+                } for key, hist in sorted(series.items())]
+                for name, series in sorted(self._histograms.items())
+            }
+            hit_ratios = {}
+            for key, value in self._counters.get("newsflash_cache_requests_total", {}).items():
+                labels = dict(key)
+                totals = hit_ratios.setdefault(labels.get("cache", ""), [0, 0])
+                totals[1] += value
+                if labels.get("result") == "hit":
+                    totals[0] += value
+        return {
+            "counters": counters,
+            "histograms": histograms,
+            "cache_hit_ratio": {cache: round(hits / total, 3) if total else 0.0
+                                for cache, (hits, total) in sorted(hit_ratios.items())},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2, default=str)
+
+    def write_json(self, path: str) -> None:
+        """Write the JSON run report to path, or to stdout when path is "-"."""
+        if path == "-":
+            print(self.to_json())
+            return
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(self.to_json())
+
+    def prometheus(self) -> str:
+        """Render every series in the Prometheus text exposition format (0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets + (float("inf"),), hist.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else _format_value(bound)
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(hist.sum)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: Labels) -> str:
+    if not key:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in key)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(key, escaped)) + "}"
+
+
+def _finite(value: float):
+    """JSON has no infinity; report quantiles past the last bucket as null."""
+    return None if value == float("inf") else value
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# Process-wide registry used by fetch_news, summarize, emailer and the scheduler
+registry = MetricsRegistry()
+inc = registry.inc
+observe = registry.observe
+timer = registry.timer
+write_json = registry.write_json
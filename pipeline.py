@@ -0,0 +1,165 @@
+"""
+Staged Pipeline
+Runs work items through a chain of stages (e.g. fetch → summarize → send),
+each backed by its own bounded worker pool with a queue between stages, so
+one slow upstream call only holds up its own worker instead of every later item.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Tuple
+import metrics
+
+# Marks the end of the input for one worker
+_DONE = object()
+
+
+class Many(list):
+    """Return from a stage function to pass several items (or none) downstream."""
+
+
+class Stage:
+    """A named pipeline step with its own worker pool and statistics."""
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers or 1))
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float, outcome: str) -> None:
+        metrics.observe("newsflash_pipeline_item_seconds", elapsed, stage=self.name)
+        with self._lock:
+            self.busy_seconds += elapsed
+            if outcome == "ok":
+                self.processed += 1
+            elif outcome == "dropped":
+                self.dropped += 1
+            else:
+                self.errors += 1
+
+
+class StagedPipeline:
+    """
+    Thread-based pipeline of stages connected by queues.
+
+    Each stage function receives one item and returns the item to pass to the
+    next stage, or None to drop it (e.g. a user with no articles). Returning a
+    Many([...]) fans out zero or more items. Exceptions are logged and counted
+    against the stage; the item is dropped.
+
+    Every queue holds at most queue_size items, so a fast stage blocks
+    instead of running far ahead of a slow one (0 = unbounded).
+
+    Example:
+        pipeline = StagedPipeline([
+            ("fetch", fetch_job, 4),
+            ("summarize", summarize_job, 4),
+            ("send", send_job, 2),
+        ])
+        results = pipeline.run(jobs)
+        print(pipeline.report())
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], Any], int]], queue_size: int = 100):
+        self.stages = [Stage(name, func, workers) for name, func, workers in stages]
+        self.queue_size = queue_size
+        self.wall_seconds = 0.0
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """Push items through every stage and return the outputs of the last stage."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: List[Any] = []
+        results_lock = threading.Lock()
+        threads: List[threading.Thread] = []
+
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            remaining_lock = threading.Lock()
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+            next_workers = self.stages[index + 1].workers if outbox is not None else 0
+
+            def emit(value, outbox=outbox):
+                if outbox is not None:
+                    outbox.put(value)
+                else:
+                    with results_lock:
+                        results.append(value)
+
+            def finish(remaining=remaining, remaining_lock=remaining_lock,
+                       outbox=outbox, next_workers=next_workers):
+                # The last worker of a stage closes the next stage's input
+                with remaining_lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and outbox is not None:
+                    for _ in range(next_workers):
+                        outbox.put(_DONE)
+
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage, inbox, emit, finish),
+                    name=f"{stage.name}-{n + 1}",
+                    daemon=True,
+                )
+                threads.append(thread)
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        first = queues[0]
+        for item in items:
+            first.put(item)
+        for _ in range(self.stages[0].workers):
+            first.put(_DONE)
+
+        for thread in threads:
+            thread.join()
+
+        self.wall_seconds = time.perf_counter() - started
+        return results
+
+    @staticmethod
+    def _worker(stage: Stage, inbox: "queue.Queue", emit: Callable, finish: Callable) -> None:
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                finish()
+                return
+
+            started = time.perf_counter()
+            try:
+                output = stage.func(item)
+            except Exception as e:
+                stage.record(time.perf_counter() - started, "error")
+                print(f"  ✗ [{stage.name}] {str(e)}")
+                continue
+
+            stage.record(time.perf_counter() - started, "ok" if output is not None else "dropped")
+            if isinstance(output, Many):
+                for value in output:
+                    emit(value)
+            elif output is not None:
+                emit(output)
+
+    def report(self) -> str:
+        """Per-stage throughput and utilization for the last run."""
+        wall = self.wall_seconds or 1e-9
+        lines = [f"Pipeline finished in {self.wall_seconds:.2f}s"]
+        for stage in self.stages:
+            handled = stage.processed + stage.dropped + stage.errors
+            utilization = stage.busy_seconds / (wall * stage.workers)
+            lines.append(
+                f"  {stage.name:<10} workers={stage.workers:<3} items={handled:<5} "
+                f"ok={stage.processed:<5} dropped={stage.dropped:<4} errors={stage.errors:<4} "
+                f"{handled / wall:.1f} items/s  busy={utilization:.0%}"
+            )
+        return "\n".join(lines)
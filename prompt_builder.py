@@ -0,0 +1,235 @@
+"""
+Token-Budgeted Prompt Builder
+Turns a topic's articles into the article block of the summarization prompt
+without letting it grow past a token budget: articles are ranked so the most
+informative ones are kept, URLs are left out (the model never needs them),
+descriptions are cleaned and truncated, and whatever does not fit is dropped.
+
+Tokens are counted with the provider's tokenizer where one is available
+locally: tiktoken for OpenAI models if it is installed. Gemini only counts
+tokens through an API call, so it (and OpenAI without tiktoken) uses an
+estimate of about 4 characters per token.
+"""
+
+import re
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from config import Config
+
+HEADER = "NEWS ARTICLES:\n\n"
+
+# Descriptions shortened below this are not worth their title line
+MIN_DESCRIPTION_TOKENS = 12
+
+# NewsAPI placeholders for articles that were taken down or have no text
+_EMPTY_VALUES = {"", "N/A", "[Removed]", "None"}
+_TAG_RE = re.compile(r"<[^>]+>")
+_CHARS_SUFFIX_RE = re.compile(r"\s*(…|\.\.\.)?\s*\[\+\d+ chars\]$")
+_WORD_RE = re.compile(r"\w+")
+
+_tokenizers_lock = threading.Lock()
+_tokenizers: Dict[Tuple[str, str], "Tokenizer"] = {}
+
+
+class Tokenizer:
+    """Character-based estimate (about 4 characters per token for English text)."""
+
+    name = "estimate"
+
+    def count(self, text: str) -> int:
+        return (len(text) + 3) // 4
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Text cut to at most max_tokens, at a word boundary, with "…" if shortened."""
+        if self.count(text) <= max_tokens:
+            return text
+        return _cut_words(text[:max(0, max_tokens * 4 - 1)])
+
+
+class TiktokenTokenizer(Tokenizer):
+    """Exact counts for OpenAI models."""
+
+    name = "tiktoken"
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return _cut_words(self.encoding.decode(tokens[:max(0, max_tokens - 1)]))
+
+
+def _cut_words(text: str) -> str:
+    """Drop a trailing partial word and mark the cut."""
+    cut = text.rsplit(" ", 1)[0] if " " in text else text
+    cut = cut.rstrip(" ,;:-")
+    return f"{cut}…" if cut else ""
+
+
+def _openai_tokenizer(model: str) -> Tokenizer:
+    try:
+        import tiktoken
+    except ImportError:
+        return Tokenizer()
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Models newer than the installed tiktoken; recent OpenAI models use o200k_base
+        try:
+            encoding = tiktoken.get_encoding("o200k_base")
+        except ValueError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    return TiktokenTokenizer(encoding)
+
+
+def get_tokenizer(provider: str = None, model: str = None) -> Tokenizer:
+    """
+    Tokenizer for a provider and model (defaults: the configured ones).
+    Loaded once per (provider, model) and shared across threads.
+    """
+    if provider is None:
+        provider, model = Config.ai_model()
+    key = (provider.upper(), model or "")
+    with _tokenizers_lock:
+        tokenizer = _tokenizers.get(key)
+        if tokenizer is None:
+            tokenizer = _tokenizers[key] = (
+                _openai_tokenizer(key[1]) if key[0] == "OPENAI" else Tokenizer()
+            )
+        return tokenizer
+
+
+def count_tokens(text: str, provider: str = None, model: str = None) -> int:
+    """Tokens in text for the given (default: configured) provider and model."""
+    return get_tokenizer(provider, model).count(text)
+
+
+def _clean(value: Optional[str]) -> str:
+    """Plain single-line text; NewsAPI placeholders become ""."""
+    if not value:
+        return ""
+    text = _CHARS_SUFFIX_RE.sub("", _TAG_RE.sub(" ", str(value)))
+    text = " ".join(text.split())
+    return "" if text in _EMPTY_VALUES else text
+
+
+def _score(article: Dict[str, str]) -> int:
+    """
+    Informativeness: distinct words in title and description, plus a bonus
+    for every other outlet carrying the story (see dedup.dedup_articles).
+    """
+    text = f"{_clean(article.get('title'))} {_clean(article.get('description'))}".lower()
+    return len(set(_WORD_RE.findall(text))) + 10 * len(article.get("duplicates") or [])
+
+
+def rank_articles(articles: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Articles worth prompting, most informative first (ties keep NewsAPI order).
+    Articles without a usable title or description are left out.
+    """
+    usable = [a for a in articles if _clean(a.get("title")) or _clean(a.get("description"))]
+    return sorted(usable, key=_score, reverse=True)
+
+
+def _entry(number: int, title: str, source: str, description: str) -> str:
+    line = f"{number}. {title}"
+    if source and source != "Unknown":
+        line += f" ({source})"
+    if description:
+        line += f"\n{description}"
+    return line + "\n\n"
+
+
+class ArticlesPrompt(NamedTuple):
+    """
+    The article block of a prompt and what went into it.
+
+    Attributes:
+        text (str): Article block to embed in the user prompt.
+        tokens (int): Tokens in text, counted with the provider's tokenizer.
+        kept (int): Articles included.
+        truncated (int): Included articles whose description was shortened to fit.
+        dropped (int): Articles left out (no usable text, or over budget).
+        tokenizer (str): "tiktoken" or "estimate".
+    """
+    text: str
+    tokens: int
+    kept: int
+    truncated: int
+    dropped: int
+    tokenizer: str
+
+
+def build_article_prompt(articles: List[Dict[str, str]], budget: int = None,
+                         provider: str = None, model: str = None) -> ArticlesPrompt:
+    """
+    Build the article block of a summarization prompt within a token budget.
+
+    Articles are added in rank order (see rank_articles) with title, source
+    and a cleaned description capped at SUMMARY_DESCRIPTION_TOKENS. When the
+    next article does not fit, its description is shortened to the room left
+    (or left out), and articles that still do not fit are dropped. URLs are
+    never included.
+
+    Args:
+        articles (List[Dict]): Articles as returned by fetch_news.
+        budget (int): Token budget for the block. Defaults to
+            SUMMARY_INPUT_TOKEN_BUDGET from config.
+        provider (str): OPENAI or GEMINI (default: configured provider).
+        model (str): Model name, used to pick the tokenizer.
+
+    Returns:
+        ArticlesPrompt: Block text, its token count and what was kept.
+    """
+    tokenizer = get_tokenizer(provider, model)
+    budget = Config.SUMMARY_INPUT_TOKEN_BUDGET if budget is None else budget
+    ranked = rank_articles(articles)
+    if not ranked:
+        text = "No articles available."
+        return ArticlesPrompt(text, tokenizer.count(text), 0, 0, len(articles), tokenizer.name)
+
+    parts = [HEADER]
+    used = tokenizer.count(HEADER)
+    truncated = 0
+
+    for article in ranked:
+        number = len(parts)
+        title = _clean(article.get("title"))
+        source = _clean(article.get("source"))
+        full = _clean(article.get("description"))
+        if not title:
+            # Untitled: the (capped) description stands in for the headline
+            title, full = tokenizer.truncate(full, Config.SUMMARY_DESCRIPTION_TOKENS), ""
+        description = tokenizer.truncate(full, Config.SUMMARY_DESCRIPTION_TOKENS)
+        entry = _entry(number, title, source, description)
+        cost = tokenizer.count(entry)
+
+        if used + cost > budget:
+            # Shorten the description to the room left, or keep the headline alone
+            bare = _entry(number, title, source, "")
+            room = budget - used - tokenizer.count(bare)
+            description = tokenizer.truncate(description, room - 1) if room >= MIN_DESCRIPTION_TOKENS else ""
+            entry = _entry(number, title, source, description)
+            cost = tokenizer.count(entry)
+            if used + cost > budget:
+                continue
+
+        truncated += description != full
+        parts.append(entry)
+        used += cost
+
+    if len(parts) == 1:
+        # Budget below a single headline: still give the model the top story
+        article = ranked[0]
+        title = _clean(article.get("title")) or _clean(article.get("description"))
+        parts.append(_entry(1, tokenizer.truncate(title, max(1, budget - used)), "", ""))
+        truncated += 1
+
+    text = "".join(parts).rstrip("\n")
+    kept = len(parts) - 1
+    return ArticlesPrompt(text, tokenizer.count(text), kept, truncated, len(articles) - kept, tokenizer.name)
@@ -0,0 +1,198 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers asking for the same key share one in-flight upstream call.
+Within a process this uses per-key events; across processes on the same host
+a SQLite lease elects one leader, which publishes its result for the others.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+from config import Config
+
+
+class _Call:
+    """An in-flight call that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces duplicate concurrent calls by key.
+
+    Only callers that overlap in time are coalesced; nothing is cached after
+    the leader finishes. Cross-process results must be JSON-serializable.
+
+    Example:
+        flight = SingleFlight()
+        articles = flight.do(f"fetch:{topic}|{size}", lambda: _fetch(topic, size))
+    """
+
+    def __init__(self, db_path: str = None, lease_ttl: float = None, poll_interval: float = None):
+        self.db_path = Config.SINGLEFLIGHT_DB if db_path is None else db_path
+        self.lease_ttl = lease_ttl or Config.SINGLEFLIGHT_LEASE_TTL
+        self.poll_interval = poll_interval or Config.SINGLEFLIGHT_POLL_INTERVAL
+        self.coalesced = 0
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        if self.db_path:
+            try:
+                self._init_db()
+            except sqlite3.Error as e:
+                print(f"⚠️  Single-flight lease store unavailable ({e}); coalescing within this process only")
+                self.db_path = ""
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for and return the result of the call already running."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_across_processes(key, fn) if self.db_path else fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    # -- cross-process leases -------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " key TEXT PRIMARY KEY, owner TEXT NOT NULL,"
+                " acquired_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+        finally:
+            conn.close()
+
+    def _acquire(self, conn: sqlite3.Connection, key: str, owner: str) -> tuple:
+        """Take the lease if it is free or expired; returns (owner, acquired_at)."""
+        now = time.time()
+        conn.execute(
+            "INSERT INTO leases (key, owner, acquired_at, expires_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, "
+            " acquired_at = excluded.acquired_at, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at < excluded.acquired_at",
+            (key, owner, now, now + self.lease_ttl),
+        )
+        row = conn.execute("SELECT owner, acquired_at FROM leases WHERE key = ?", (key,)).fetchone()
+        return row if row else (None, now)
+
+    def _run_across_processes(self, key: str, fn: Callable[[], Any]) -> Any:
+        owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        deadline = time.time() + self.lease_ttl
+        try:
+            conn = self._connect()
+        except sqlite3.Error as e:
+            print(f"⚠️  Single-flight lease store unavailable ({e}); calling directly")
+            return fn()
+
+        try:
+            while True:
+                holder, acquired_at = self._acquire(conn, key, owner)
+                if holder == owner:
+                    return self._lead(conn, key, owner, fn)
+
+                # Another process is fetching: wait for its published result
+                while time.time() < deadline:
+                    row = conn.execute(
+                        "SELECT value, created_at FROM results WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row and row[1] >= acquired_at:
+                        with self._lock:
+                            self.coalesced += 1
+                        return json.loads(row[0])
+                    lease = conn.execute(
+                        "SELECT owner, expires_at FROM leases WHERE key = ?", (key,)
+                    ).fetchone()
+                    if lease is None or lease[0] != holder or lease[1] < time.time():
+                        break  # leader gave up or died; try to take over
+                    time.sleep(self.poll_interval)
+                else:
+                    return fn()
+        except sqlite3.Error as e:
+            print(f"⚠️  Single-flight lease error ({e}); calling directly")
+            return fn()
+        finally:
+            conn.close()
+
+    def _lead(self, conn: sqlite3.Connection, key: str, owner: str, fn: Callable[[], Any]) -> Any:
+        try:
+            result = fn()
+            self._publish(conn, key, result)
+            return result
+        finally:
+            try:
+                conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+            except sqlite3.Error as e:
+                print(f"⚠️  Could not release single-flight lease ({e}); it will expire")
+
+    def _publish(self, conn: sqlite3.Connection, key: str, result: Any) -> None:
+        """Share the leader's result with waiting processes (best effort)."""
+        try:
+            value = json.dumps(result, default=_to_json)
+        except (TypeError, ValueError):
+            return
+        now = time.time()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, now),
+            )
+            conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.lease_ttl,))
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not publish single-flight result ({e})")
+
+
+def _to_json(value: Any) -> Any:
+    """Publish objects with a dict form (e.g. Article) as that dict."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_default_flight: Optional[SingleFlight] = None
+_default_lock = threading.Lock()
+
+
+def get_flight() -> SingleFlight:
+    """Return the process-wide single-flight group used by fetch and summarize."""
+    global _default_flight
+    if _default_flight is None:
+        with _default_lock:
+            if _default_flight is None:
+                _default_flight = SingleFlight()
+    return _default_flight
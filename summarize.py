@@ -3,9 +3,36 @@ Phase 2: AI Summarization
 This module handles AI-powered news summarization using OpenAI API.
 """
 
-from typing import List, Dict
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
+import metrics
 from config import Config
-from openai import OpenAI
+from prompt_builder import ArticlesPrompt, build_article_prompt, count_tokens
+from singleflight import get_flight
+from summary_cache import get_summary_cache, summary_key
+
+# Provider SDKs are imported on first use, so only the selected one is loaded
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+# Bump whenever the prompts change so cached summaries are not reused
+PROMPT_VERSION = "2"
+
+SYSTEM_PROMPT = """You are a financial news analyst specializing in technology and startup ecosystems.
+Your task is to synthesize multiple news articles into concise, factual bullet points.
+Focus on business impact, market trends, and key developments.
+Be objective and neutral in tone."""
+
+# Process-wide provider clients, reused across summaries
+_clients_lock = threading.Lock()
+_openai_client: Optional["OpenAI"] = None
+_async_openai_client: Optional["AsyncOpenAI"] = None
+_async_openai_loop = None
+_gemini_configured_key: Optional[str] = None
+_gemini_models: Dict[str, object] = {}
+_gemini_working_model: Optional[Tuple[str, float]] = None
 
 
 def format_articles_for_prompt(articles: List[Dict[str, str]]) -> str:
@@ -13,158 +40,563 @@ def format_articles_for_prompt(articles: List[Dict[str, str]]) -> str:
     Format articles into a readable text block for the GPT prompt.
     
     Args:
-        articles (List[Dict]): List of articles with title, description, url.
+        articles (List[Dict]): List of articles with title, description, source.
     
     Returns:
-        str: Formatted articles text.
+        str: Formatted articles text, within SUMMARY_INPUT_TOKEN_BUDGET tokens
+            (see prompt_builder.build_article_prompt).
     """
-    if not articles:
-        return "No articles available."
-    
-    formatted = "NEWS ARTICLES:\n" + "=" * 50 + "\n\n"
-    
-    for idx, article in enumerate(articles, 1):
-        formatted += f"Article {idx}:\n"
-        formatted += f"Title: {article.get('title', 'N/A')}\n"
-        formatted += f"Description: {article.get('description', 'N/A')}\n"
-        formatted += f"Source: {article.get('source', 'N/A')}\n"
-        formatted += f"URL: {article.get('url', 'N/A')}\n"
-        formatted += "-" * 50 + "\n\n"
-    
-    return formatted
+    return _article_block(articles).text
+
+
+def _article_block(articles: List[Dict[str, str]]) -> ArticlesPrompt:
+    """Token-budgeted article block for the configured provider and model."""
+    provider, model = Config.ai_model()
+    block = build_article_prompt(articles, provider=provider, model=model)
+    for outcome in ("kept", "truncated", "dropped"):
+        metrics.inc("newsflash_prompt_articles_total", getattr(block, outcome), outcome=outcome)
+    return block
+
+
+def _record_prompt(system_prompt: str, user_prompt: str) -> int:
+    """Count the tokens of a prompt about to be sent, for cost per summary."""
+    provider, model = Config.ai_model()
+    tokens = count_tokens(system_prompt, provider, model) + count_tokens(user_prompt, provider, model)
+    metrics.inc("newsflash_prompts_total", provider=provider.lower())
+    metrics.inc("newsflash_prompt_tokens_total", tokens, provider=provider.lower())
+    return tokens
+
+
+def _build_prompts(articles: List[Dict[str, str]], block: ArticlesPrompt = None) -> Tuple[str, str]:
+    """
+    Build the (system, user) prompt pair shared by every provider.
+    block, if given, is the article block already built for these articles
+    (so its articles are not counted in the prompt metrics twice).
+    """
+    block = block or _article_block(articles)
+
+    system_prompt = SYSTEM_PROMPT
+
+    user_prompt = f"""{block.text}
+
+Based on the above articles, summarize the key news into exactly 3 concise bullet points.
+Each bullet should:
+- Be 1-2 sentences maximum
+- Highlight the most important development or trend
+- Be readable in under 60 seconds total
+- Avoid repetition and be factually accurate
+- Include specific numbers or names when available
+
+Format your response as:
+• [Bullet 1]
+• [Bullet 2]
+• [Bullet 3]"""
+
+    tokens = _record_prompt(system_prompt, user_prompt)
+    shortened = f", {block.truncated} shortened" if block.truncated else ""
+    print(f"  → Prompt: {block.kept}/{len(articles)} articles{shortened}, {tokens} tokens ({block.tokenizer})")
+    return system_prompt, user_prompt
 
 
 def summarize_news(articles: List[Dict[str, str]]) -> str:
     """
     Summarize news articles into 3 concise bullet points using the selected provider.
     Provider options: OPENAI (default) or GEMINI. Falls back to local summary on error.
+    Summaries for an article set seen before are served from the summary cache.
     """
 
     if not articles:
         return "No articles to summarize."
 
-    articles_text = format_articles_for_prompt(articles)
+    with metrics.timer("newsflash_stage_seconds", stage="summarize"):
+        cached, key = _cached_summary(articles)
+        if cached is not None:
+            return cached
 
-    system_prompt = """You are a financial news analyst specializing in technology and startup ecosystems.
-Your task is to synthesize multiple news articles into concise, factual bullet points.
-Focus on business impact, market trends, and key developments.
-Be objective and neutral in tone."""
+        # Concurrent requests for the same article set share one LLM call
+        return get_flight().do(f"summary:{key}", lambda: _generate_summary(articles, key))
 
-    user_prompt = f"""{articles_text}
 
-Based on the above articles, summarize the key news into exactly 3 concise bullet points.
+def _generate_summary(articles: List[Dict[str, str]], key: str) -> str:
+    """Call the provider for one article set and cache the result."""
+    system_prompt, user_prompt = _build_prompts(articles)
+
+    summary = _summarize_provider(system_prompt, user_prompt)
+
+    return _store_summary(key, summary, articles)
+
+
+async def asummarize_news(articles: List[Dict[str, str]]) -> str:
+    """
+    Async counterpart of summarize_news using the OpenAI async client or the
+    async Gemini call. Same prompt, provider selection, cache and fallback behaviour.
+    """
+
+    if not articles:
+        return "No articles to summarize."
+
+    cached, key = _cached_summary(articles)
+    if cached is not None:
+        return cached
+
+    system_prompt, user_prompt = _build_prompts(articles)
+
+    provider, _ = Config.ai_model()
+
+    if provider == "GEMINI":
+        summary = await _asummarize_gemini(system_prompt, user_prompt)
+    else:
+        summary = await _asummarize_openai(system_prompt, user_prompt)
+
+    return _store_summary(key, summary, articles)
+
+
+def summarize_many(topic_articles: Dict[str, List[Dict[str, str]]]) -> Dict[str, str]:
+    """
+    Summarize several topics with as few LLM requests as possible.
+
+    Topics are packed into one structured request (JSON output keyed by topic)
+    while the estimated prompt stays within SUMMARY_BATCH_TOKEN_BUDGET; larger
+    sets are split into several batches. Cached topics are served from the
+    summary cache, and a topic missing from a batch response is retried on
+    its own with the same article block.
+
+    Args:
+        topic_articles (Dict[str, List[Dict]]): Articles per topic.
+
+    Returns:
+        Dict[str, str]: Summary per topic, in the same format as summarize_news.
+    """
+    with metrics.timer("newsflash_stage_seconds", stage="summarize_many"):
+        return _summarize_many(topic_articles)
+
+
+def _summarize_many(topic_articles: Dict[str, List[Dict[str, str]]]) -> Dict[str, str]:
+    summaries: Dict[str, str] = {}
+    pending: Dict[str, Tuple[List[Dict[str, str]], Optional[str]]] = {}
+
+    for topic, articles in topic_articles.items():
+        if not articles:
+            summaries[topic] = "No articles to summarize."
+            continue
+        cached, key = _cached_summary(articles)
+        if cached is not None:
+            summaries[topic] = cached
+        else:
+            pending[topic] = (articles, key)
+
+    blocks = {topic: _article_block(articles) for topic, (articles, _) in pending.items()}
+    for batch in _plan_batches(blocks):
+        if len(batch) == 1:
+            topic = batch[0]
+            articles, key = pending[topic]
+            system_prompt, user_prompt = _build_prompts(articles, blocks[topic])
+            summaries[topic] = _store_summary(key, _summarize_provider(system_prompt, user_prompt), articles)
+            continue
+
+        user_prompt = _build_batch_prompt(batch, blocks)
+        tokens = _record_prompt(SYSTEM_PROMPT, user_prompt)
+        print(f"🧠 Summarizing {len(batch)} topics in one request ({tokens} prompt tokens)...")
+        response = _summarize_provider(SYSTEM_PROMPT, user_prompt, max_tokens=300 * len(batch))
+        parsed = _parse_batch_response(response, batch)
+
+        for topic in batch:
+            articles, key = pending[topic]
+            if response is None:
+                summaries[topic] = _fallback_summary(articles)
+            elif topic in parsed:
+                summaries[topic] = _store_summary(key, parsed[topic], articles)
+            else:
+                print(f"  → No usable summary for '{topic}' in batch response, retrying alone")
+                system_prompt, user_prompt = _build_prompts(articles, blocks[topic])
+                summaries[topic] = _store_summary(key, _summarize_provider(system_prompt, user_prompt), articles)
+
+    return summaries
+
+
+def _plan_batches(blocks: Dict[str, ArticlesPrompt]) -> List[List[str]]:
+    """Group topics so each batch prompt stays within the token budget."""
+    budget = Config.SUMMARY_BATCH_TOKEN_BUDGET
+    overhead = count_tokens(SYSTEM_PROMPT) + 150
+    batches: List[List[str]] = []
+    current: List[str] = []
+    used = overhead
+
+    for topic, block in blocks.items():
+        cost = block.tokens + 10
+        if current and (used + cost > budget or len(current) >= Config.SUMMARY_BATCH_MAX_TOPICS):
+            batches.append(current)
+            current, used = [], overhead
+        current.append(topic)
+        used += cost
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _build_batch_prompt(batch: List[str], blocks: Dict[str, ArticlesPrompt]) -> str:
+    """User prompt covering several topics with JSON output keyed by topic."""
+    sections = []
+    for topic in batch:
+        sections.append(f"### TOPIC: {topic}\n{blocks[topic].text}\n")
+
+    return "\n".join(sections) + f"""
+
+For EACH topic above, summarize its articles into exactly 3 concise bullet points.
 Each bullet should:
 - Be 1-2 sentences maximum
 - Highlight the most important development or trend
-- Be readable in under 60 seconds total
 - Avoid repetition and be factually accurate
 - Include specific numbers or names when available
 
-Format your response as:
-• [Bullet 1]
-• [Bullet 2]
-• [Bullet 3]"""
+Respond with only a JSON object mapping each topic name exactly as written
+above to a string of 3 lines, each starting with "• ". Topics: {json.dumps(batch)}"""
 
-    provider = (Config.AI_PROVIDER or "OPENAI").upper()
 
+def _parse_batch_response(response: Optional[str], batch: List[str]) -> Dict[str, str]:
+    """Extract per-topic summaries from a batch response; bad entries are skipped."""
+    if not response:
+        return {}
+    start, end = response.find("{"), response.rfind("}")
+    try:
+        data = json.loads(response[start:end + 1]) if start != -1 else {}
+    except ValueError:
+        print("  → Batch response was not valid JSON")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    parsed = {}
+    for topic in batch:
+        value = data.get(topic)
+        if isinstance(value, list):
+            value = "\n".join(str(v) for v in value)
+        if isinstance(value, str) and value.strip():
+            parsed[topic] = value.strip()
+    return parsed
+
+
+def _summarize_provider(system_prompt: str, user_prompt: str, max_tokens: int = 300) -> Optional[str]:
+    """Dispatch to the configured provider; returns None on errors."""
+    provider, _ = Config.ai_model()
     if provider == "GEMINI":
-        return _summarize_gemini(system_prompt, user_prompt, articles)
-    # Default to OPENAI
-    return _summarize_openai(system_prompt, user_prompt, articles)
+        return _summarize_gemini(system_prompt, user_prompt)
+    return _summarize_openai(system_prompt, user_prompt, max_tokens)
+
 
+def _cached_summary(articles: List[Dict[str, str]]) -> Tuple[Optional[str], str]:
+    """
+    Look up the summary cache.
 
-def _summarize_openai(system_prompt: str, user_prompt: str, articles: List[Dict[str, str]]) -> str:
-    """Call OpenAI Chat Completions API and fall back on errors."""
+    Returns:
+        tuple: (cached summary or None, content key for this article set).
+    """
+    provider, model = Config.ai_model()
+    # The budgets decide which articles reach the model, so they are part of the prompt
+    prompt_version = f"{PROMPT_VERSION}:{Config.SUMMARY_INPUT_TOKEN_BUDGET}:{Config.SUMMARY_DESCRIPTION_TOKENS}"
+    key = summary_key(provider, model, articles, prompt_version)
+    cache = get_summary_cache()
+    if cache is None:
+        return None, key
+    cached = cache.get(key)
+    metrics.inc("newsflash_cache_requests_total", cache="summary",
+                result="hit" if cached is not None else "miss")
+    if cached is not None:
+        print("✓ Summary served from cache")
+    return cached, key
+
+
+def _store_summary(key: str, summary: Optional[str], articles: List[Dict[str, str]]) -> str:
+    """Cache a provider summary, or return the local fallback (never cached)."""
+    if summary is None:
+        return _fallback_summary(articles)
+    cache = get_summary_cache()
+    if cache is not None:
+        cache.put(key, summary)
+    return summary
+
+
+def _get_openai_client() -> "OpenAI":
+    """Return the process-wide OpenAI client, rebuilt only if the API key changes."""
+    global _openai_client
+    from openai import OpenAI
+    with _clients_lock:
+        if _openai_client is None or _openai_client.api_key != Config.OPENAI_API_KEY:
+            _openai_client = OpenAI(api_key=Config.OPENAI_API_KEY, base_url=Config.OPENAI_BASE_URL)
+        return _openai_client
+
+
+def _get_async_openai_client() -> "AsyncOpenAI":
+    """Return the AsyncOpenAI client for the running event loop."""
+    global _async_openai_client, _async_openai_loop
+    import asyncio
+    from openai import AsyncOpenAI
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        if (_async_openai_client is None or _async_openai_loop is not loop
+                or _async_openai_client.api_key != Config.OPENAI_API_KEY):
+            _async_openai_client = AsyncOpenAI(api_key=Config.OPENAI_API_KEY, base_url=Config.OPENAI_BASE_URL)
+            _async_openai_loop = loop
+        return _async_openai_client
+
+
+def _openai_request(system_prompt: str, user_prompt: str, max_tokens: int = 300) -> dict:
+    """Chat Completions arguments shared by the sync and async clients."""
+    return {
+        "model": Config.OPENAI_MODEL,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": 0.7,
+        "max_tokens": max_tokens,
+        "top_p": 1.0,
+    }
+
+
+def _report_openai_error(e: Exception) -> None:
+    """Print a hint for an OpenAI failure before falling back."""
+    print(f"✗ Error generating summary (OpenAI): {str(e)}")
+    if "401" in str(e) or "Unauthorized" in str(e):
+        print("  → Invalid OpenAI API key. Please check OPENAI_API_KEY in .env")
+    elif "429" in str(e) or "rate limit" in str(e).lower() or "insufficient_quota" in str(e).lower():
+        print("  → Rate limit/quota exceeded. Using local fallback summary.")
+    else:
+        print("  → Falling back to local summary due to an unexpected error.")
+
+
+def _summarize_openai(system_prompt: str, user_prompt: str, max_tokens: int = 300) -> Optional[str]:
+    """Call OpenAI Chat Completions API; returns None on errors."""
     try:
         print("🧠 Generating AI summary (OpenAI)...")
 
-        client = OpenAI(api_key=Config.OPENAI_API_KEY)
-        response = client.chat.completions.create(
-            model=Config.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=300,
-            top_p=1.0
-        )
+        client = _get_openai_client()
+        with metrics.timer("newsflash_upstream_seconds", service="openai"):
+            response = client.chat.completions.create(**_openai_request(system_prompt, user_prompt, max_tokens))
 
         summary = response.choices[0].message.content.strip()
+        _record_llm_call("openai", "ok", system_prompt + user_prompt, summary, response)
         print("✓ Summary generated successfully")
         return summary
 
     except Exception as e:
-        print(f"✗ Error generating summary (OpenAI): {str(e)}")
-        if "401" in str(e) or "Unauthorized" in str(e):
-            print("  → Invalid OpenAI API key. Please check OPENAI_API_KEY in .env")
-        elif "429" in str(e) or "rate limit" in str(e).lower() or "insufficient_quota" in str(e).lower():
-            print("  → Rate limit/quota exceeded. Using local fallback summary.")
-        else:
-            print("  → Falling back to local summary due to an unexpected error.")
-        return _fallback_summary(articles)
+        _record_llm_call("openai", "error", system_prompt + user_prompt)
+        _report_openai_error(e)
+        return None
 
 
-def _summarize_gemini(system_prompt: str, user_prompt: str, articles: List[Dict[str, str]]) -> str:
-    """Call Gemini API with model fallbacks and return local summary on errors."""
+async def _asummarize_openai(system_prompt: str, user_prompt: str) -> Optional[str]:
+    """Async OpenAI Chat Completions call; returns None on errors."""
+    try:
+        print("🧠 Generating AI summary (OpenAI, async)...")
+
+        client = _get_async_openai_client()
+        with metrics.timer("newsflash_upstream_seconds", service="openai"):
+            response = await client.chat.completions.create(**_openai_request(system_prompt, user_prompt))
+
+        summary = response.choices[0].message.content.strip()
+        _record_llm_call("openai", "ok", system_prompt + user_prompt, summary, response)
+        print("✓ Summary generated successfully")
+        return summary
+
+    except Exception as e:
+        _record_llm_call("openai", "error", system_prompt + user_prompt)
+        _report_openai_error(e)
+        return None
+
+
+def _record_llm_call(service: str, outcome: str, prompt: str, summary: str = "", response=None) -> None:
+    """Count one LLM request, its payload size and the token usage the provider reported."""
+    metrics.inc("newsflash_upstream_requests_total", service=service, outcome=outcome)
+    metrics.inc("newsflash_upstream_bytes_total", len(prompt.encode("utf-8")), service=service, direction="sent")
+    if summary:
+        metrics.inc("newsflash_upstream_bytes_total", len(summary.encode("utf-8")),
+                    service=service, direction="received")
+
+    # OpenAI: response.usage.prompt_tokens/completion_tokens
+    # Gemini: response.usage_metadata.prompt_token_count/candidates_token_count
+    usage = getattr(response, "usage", None) or getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or getattr(usage, "prompt_token_count", 0)
+    completion_tokens = getattr(usage, "completion_tokens", None) or getattr(usage, "candidates_token_count", 0)
+    metrics.inc("newsflash_llm_tokens_total", prompt_tokens or 0, provider=service, kind="prompt")
+    metrics.inc("newsflash_llm_tokens_total", completion_tokens or 0, provider=service, kind="completion")
+
+
+def _gemini_candidate_models() -> List[str]:
+    """Configured Gemini model first, then sensible fallbacks."""
+    candidate_models = []
+    configured = (Config.GEMINI_MODEL or "").strip()
+    if configured:
+        candidate_models.append(configured)
+    # Common alternates across library versions
+    for m in [
+        "gemini-1.5-flash-latest",
+        "gemini-1.5-flash",
+        "gemini-1.0-pro",
+        "gemini-pro"
+    ]:
+        if m not in candidate_models:
+            candidate_models.append(m)
+    return candidate_models
+
+
+def _configure_gemini():
+    """Import and configure the Gemini SDK once per API key."""
+    global _gemini_configured_key
+    import google.generativeai as genai
+
+    with _clients_lock:
+        if _gemini_configured_key != Config.GEMINI_API_KEY:
+            genai.configure(api_key=Config.GEMINI_API_KEY)
+            _gemini_configured_key = Config.GEMINI_API_KEY
+            _gemini_models.clear()
+    return genai
+
+
+def _get_gemini_model(model_name: str):
+    """Return a reusable GenerativeModel handle for model_name."""
+    genai = _configure_gemini()
+
+    with _clients_lock:
+        model = _gemini_models.get(model_name)
+        if model is None:
+            model = _gemini_models[model_name] = genai.GenerativeModel(model_name)
+        return model
+
+
+def _gemini_models_to_try() -> List[str]:
+    """
+    Candidate models, with the last model known to work tried first.
+    The remembered model expires after GEMINI_MODEL_TTL seconds.
+    """
+    candidates = _gemini_candidate_models()
+    with _clients_lock:
+        working = _gemini_working_model
+    if working and time.monotonic() - working[1] < Config.GEMINI_MODEL_TTL:
+        return [working[0]] + [m for m in candidates if m != working[0]]
+    return candidates
+
+
+def _remember_gemini_model(model_name: str) -> None:
+    global _gemini_working_model
+    with _clients_lock:
+        _gemini_working_model = (model_name, time.monotonic())
+
+
+def _forget_gemini_model(model_name: str) -> None:
+    """Drop a model that stopped working (e.g. 404) so the next call re-probes."""
+    global _gemini_working_model
+    with _clients_lock:
+        if _gemini_working_model and _gemini_working_model[0] == model_name:
+            _gemini_working_model = None
+        _gemini_models.pop(model_name, None)
+
+
+def _gemini_error_action(model_name: str, e: Exception) -> str:
+    """Print a hint for a Gemini failure and return "next" or "stop"."""
+    msg = str(e)
+    if "404" in msg or "not found" in msg.lower() or "unsupported" in msg.lower():
+        print(f"  → Model '{model_name}' unavailable, trying alternate...")
+        return "next"
+    if "permission" in msg.lower() or "invalid" in msg.lower():
+        print("  → Check GEMINI_API_KEY and GEMINI_MODEL in .env")
+        return "stop"
+    if "quota" in msg.lower() or "rate" in msg.lower():
+        print("  → Rate limit/quota exceeded. Using local fallback summary.")
+        return "stop"
+    print(f"  → Unexpected error with '{model_name}', trying alternate...")
+    return "next"
+
+
+def _summarize_gemini(system_prompt: str, user_prompt: str) -> Optional[str]:
+    """Call Gemini API with model fallbacks; returns None on errors."""
     if not Config.GEMINI_API_KEY:
         print("✗ Gemini API key missing. Falling back to local summary.")
-        return _fallback_summary(articles)
+        return None
 
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-
-        # Try configured model first, then sensible fallbacks
-        candidate_models = []
-        configured = (Config.GEMINI_MODEL or "").strip()
-        if configured:
-            candidate_models.append(configured)
-        # Common alternates across library versions
-        for m in [
-            "gemini-1.5-flash-latest",
-            "gemini-1.5-flash",
-            "gemini-1.0-pro",
-            "gemini-pro"
-        ]:
-            if m not in candidate_models:
-                candidate_models.append(m)
+        _configure_gemini()
 
         last_err = None
-        for model_name in candidate_models:
+        for model_name in _gemini_models_to_try():
             try:
                 print(f"🧠 Generating AI summary (Gemini: {model_name})...")
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(f"{system_prompt}\n\n{user_prompt}")
+                model = _get_gemini_model(model_name)
+                with metrics.timer("newsflash_upstream_seconds", service="gemini"):
+                    response = model.generate_content(f"{system_prompt}\n\n{user_prompt}")
                 summary = (getattr(response, "text", "") or "").strip()
+                _record_llm_call("gemini", "ok" if summary else "empty", system_prompt + user_prompt,
+                                 summary, response)
                 if summary:
                     print("✓ Summary generated successfully")
+                    _remember_gemini_model(model_name)
                     return summary
                 else:
                     print("✗ Empty response from Gemini, trying next model...")
             except Exception as e:
                 last_err = e
-                msg = str(e)
-                if "404" in msg or "not found" in msg.lower() or "unsupported" in msg.lower():
-                    print(f"  → Model '{model_name}' unavailable, trying alternate...")
-                    continue
-                if "permission" in msg.lower() or "invalid" in msg.lower():
-                    print("  → Check GEMINI_API_KEY and GEMINI_MODEL in .env")
+                _record_llm_call("gemini", "error", system_prompt + user_prompt)
+                action = _gemini_error_action(model_name, e)
+                if action == "next":
+                    _forget_gemini_model(model_name)
+                if action == "stop":
                     break
-                if "quota" in msg.lower() or "rate" in msg.lower():
-                    print("  → Rate limit/quota exceeded. Using local fallback summary.")
+
+        if last_err:
+            print(f"✗ Error generating summary (Gemini): {last_err}")
+        print("  → Falling back to local summary.")
+        return None
+    except Exception as e:
+        print(f"✗ Error initializing Gemini: {e}")
+        print("  → Falling back to local summary.")
+        return None
+
+
+async def _asummarize_gemini(system_prompt: str, user_prompt: str) -> Optional[str]:
+    """Async Gemini call (generate_content_async) with the same model fallbacks."""
+    if not Config.GEMINI_API_KEY:
+        print("✗ Gemini API key missing. Falling back to local summary.")
+        return None
+
+    try:
+        _configure_gemini()
+
+        last_err = None
+        for model_name in _gemini_models_to_try():
+            try:
+                print(f"🧠 Generating AI summary (Gemini async: {model_name})...")
+                model = _get_gemini_model(model_name)
+                with metrics.timer("newsflash_upstream_seconds", service="gemini"):
+                    response = await model.generate_content_async(f"{system_prompt}\n\n{user_prompt}")
+                summary = (getattr(response, "text", "") or "").strip()
+                _record_llm_call("gemini", "ok" if summary else "empty", system_prompt + user_prompt,
+                                 summary, response)
+                if summary:
+                    print("✓ Summary generated successfully")
+                    _remember_gemini_model(model_name)
+                    return summary
+                else:
+                    print("✗ Empty response from Gemini, trying next model...")
+            except Exception as e:
+                last_err = e
+                _record_llm_call("gemini", "error", system_prompt + user_prompt)
+                action = _gemini_error_action(model_name, e)
+                if action == "next":
+                    _forget_gemini_model(model_name)
+                if action == "stop":
                     break
-                print(f"  → Unexpected error with '{model_name}', trying alternate...")
-                continue
 
         if last_err:
             print(f"✗ Error generating summary (Gemini): {last_err}")
         print("  → Falling back to local summary.")
-        return _fallback_summary(articles)
+        return None
     except Exception as e:
         print(f"✗ Error initializing Gemini: {e}")
         print("  → Falling back to local summary.")
-        return _fallback_summary(articles)
+        return None
 
 
 def _fallback_summary(articles: List[Dict[str, str]]) -> str:
@@ -181,6 +613,8 @@ def _fallback_summary(articles: List[Dict[str, str]]) -> str:
     if not articles:
         return "No articles to summarize."
 
+    metrics.inc("newsflash_fallback_summaries_total")
+
     def clean(text: str) -> str:
         if not text:
             return ""
@@ -0,0 +1,154 @@
+"""
+Summary Cache
+Persistent, content-addressed cache of AI summaries. Entries are keyed by a
+hash of the provider, model, prompt version and the normalized article set,
+so the same articles are never summarized twice while the entry is fresh.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from config import Config
+
+# Hot entries kept in process for lookups that skip SQLite entirely
+_MEMORY_ENTRIES = 256
+
+# Run eviction every N writes rather than on every put
+_EVICT_EVERY = 50
+
+# Memory hits are written back to last_used in batches of this size (and before eviction)
+_TOUCH_BATCH = 64
+
+
+def summary_key(provider: str, model: str, articles: List[Dict[str, str]],
+                prompt_version: str) -> str:
+    """
+    Build the cache key for a summary request.
+
+    Articles are reduced to their normalized URL and title and sorted, so the
+    same article set hits the cache regardless of order or whitespace.
+    """
+    normalized = sorted(
+        f"{(a.get('url') or '').strip().lower()}\t{' '.join((a.get('title') or '').split())}"
+        for a in articles
+    )
+    digest = hashlib.sha256()
+    digest.update(f"{provider}\n{model}\n{prompt_version}\n".encode("utf-8"))
+    digest.update("\n".join(normalized).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    SQLite-backed summary cache with an in-memory LRU front.
+
+    Entries older than max_age seconds are ignored and evicted; when the
+    table grows past max_entries the least recently used rows are dropped.
+    Hits served from memory still refresh last_used (batched), so the hottest
+    keys are not the first to be evicted from disk.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None, max_age: int = None):
+        self.path = path or Config.SUMMARY_CACHE_PATH
+        self.max_entries = max_entries or Config.SUMMARY_CACHE_MAX_ENTRIES
+        self.max_age = max_age or Config.SUMMARY_CACHE_MAX_AGE
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._writes = 0
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY,"
+            " summary TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_summaries_last_used ON summaries (last_used)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached summary for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached and now - cached[1] < self.max_age:
+                self._memory.move_to_end(key)
+                self._touched[key] = now
+                if len(self._touched) >= _TOUCH_BATCH:
+                    self._flush_touched()
+                    self._conn.commit()
+                self.hits += 1
+                return cached[0]
+
+            row = self._conn.execute(
+                "SELECT summary, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if not row or now - row[1] >= self.max_age:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember(key, row[0], row[1])
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, summary: str) -> None:
+        """Store a summary, evicting stale and excess entries periodically."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, summary, now, now),
+            )
+            self._conn.commit()
+            self._remember(key, summary, now)
+            self._writes += 1
+            if self._writes % _EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _remember(self, key: str, summary: str, created_at: float) -> None:
+        self._memory[key] = (summary, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > _MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def _flush_touched(self) -> None:
+        """Write last_used for keys served from memory since the last flush (caller commits)."""
+        if self._touched:
+            self._conn.executemany("UPDATE summaries SET last_used = ? WHERE key = ?",
+                                   [(used, key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self, now: float) -> None:
+        self._flush_touched()
+        self._conn.execute("DELETE FROM summaries WHERE created_at < ?", (now - self.max_age,))
+        self._conn.execute(
+            "DELETE FROM summaries WHERE key IN ("
+            " SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+
+_default_cache: Optional[SummaryCache] = None
+_default_lock = threading.Lock()
+
+
+def get_summary_cache() -> Optional[SummaryCache]:
+    """Return the process-wide summary cache, or None when it is disabled."""
+    global _default_cache
+    if not Config.SUMMARY_CACHE_ENABLED:
+        return None
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = SummaryCache()
+    return _default_cache
@@ -0,0 +1,30 @@
+"""
+Shared test setup: the repo's flat modules and webapp/ on sys.path, and the
+web app pointed at a throwaway SQLite database before it is imported.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "webapp"))
+sys.path.insert(0, ROOT)
+
+_DB_DIR = tempfile.mkdtemp(prefix="newsflash-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}")
+os.environ.setdefault("SINGLEFLIGHT_DB", "")
+os.environ.setdefault("SUMMARY_CACHE_ENABLED", "false")
+
+
+@pytest.fixture
+def app_db():
+    """The web app's db with fresh tables, inside an app context."""
+    from app import app, db
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield db
+        db.session.remove()
@@ -0,0 +1,20 @@
+"""Provider SDKs and other heavy modules must stay out of startup (see benchmarks/import_time.py)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import import_time  # noqa: E402
+
+
+@pytest.mark.parametrize("target", sorted(import_time.TARGETS))
+def test_startup_does_not_import_heavy_sdks(target):
+    _, modules, _ = import_time.measure(import_time.TARGETS[target])
+
+    eager = [module for module in import_time.LAZY_MODULES if module in modules]
+    assert not eager, f"{target} imports {', '.join(eager)} at startup"
+    # The SDKs must not come in through a submodule either
+    assert not [module for module in modules if module.startswith(("openai.", "google.generativeai."))]
@@ -0,0 +1,90 @@
+"""The scheduler summarizes several topics per LLM batch, not one topic at a time."""
+
+from types import SimpleNamespace
+
+import pytest
+
+
+class _FakeCache:
+    """TopicCache stand-in that records each get_summaries call."""
+
+    def __init__(self, empty=()):
+        self.empty = set(empty)
+        self.calls = []
+
+    def plan(self, requests):
+        list(requests)
+
+    def get_articles(self, topic, max_articles=None, since=None, raise_errors=False):
+        if topic in self.empty:
+            return []
+        return [{"title": f"{topic} story {i}", "url": f"https://example.com/{topic}/{i}",
+                 "source": "Wire", "publishedAt": f"2026-01-01T0{i}:00:00Z"} for i in range(3)]
+
+    def get_summaries(self, sections, variants=None):
+        self.calls.append([topic for topic, _, _ in sections])
+        return [f"• {topic}" for topic, _, _ in sections]
+
+
+def _run(users, cache, monkeypatch, max_topics):
+    from config import Config
+    from pipeline import StagedPipeline
+    from planner import PlanRunner, build_plan
+    monkeypatch.setattr(Config, "SUMMARY_BATCH_MAX_TOPICS", max_topics)
+    plan = build_plan(users)
+    done = {}
+    runner = PlanRunner(plan, cache, mailer=None, on_done=lambda user, status, error: None)
+    runner.send_user = lambda user: done.setdefault(user.email, {
+        key: runner._topics[key].summaries for key, _, _ in user.sections})
+    StagedPipeline([
+        ("fetch", runner.fetch_topic, 3),
+        ("summarize", runner.summarize_topic, 2),
+        ("send", runner.send_user, 1),
+    ]).run(plan.topics)
+    return plan, done
+
+
+def _users(count, topics):
+    return [SimpleNamespace(id=i, username=f"u{i}", email=f"u{i}@example.com",
+                            preferences=[SimpleNamespace(topic=t, max_articles=None) for t in topics])
+            for i in range(count)]
+
+
+@pytest.mark.parametrize("max_topics", [1, 2, 8])
+def test_topics_share_summary_batches(monkeypatch, max_topics):
+    topics = [f"Topic {t}" for t in range(5)]
+    cache = _FakeCache()
+    plan, done = _run(_users(3, topics), cache, monkeypatch, max_topics)
+
+    assert sorted(sum(cache.calls, [])) == sorted(topics)
+    # Every batch but the last holds at least max_topics sections
+    assert len(cache.calls) <= len(topics) // max_topics + 1
+    if max_topics >= len(topics):
+        assert len(cache.calls) == 1
+    assert len(done) == 3
+    assert all(len(summaries) == len(topics) and all(summaries.values())
+               for summaries in done.values())
+
+
+def test_empty_topics_release_users_without_summaries(monkeypatch):
+    cache = _FakeCache(empty={"Quiet"})
+    plan, done = _run(_users(2, ["Quiet"]), cache, monkeypatch, 8)
+
+    assert cache.calls == []
+    assert len(done) == 2
+
+
+def test_expected_llm_requests_count_every_slice(monkeypatch):
+    from config import Config
+    from delivery_marks import Mark
+    from planner import build_plan
+    monkeypatch.setattr(Config, "SUMMARY_BATCH_MAX_TOPICS", 2)
+    users = _users(3, ["AI"])
+    users[0].preferences[0].max_articles = 3
+    mark = Mark("2026-01-01T00:00:00Z", ("https://example.com/seen",))
+    plan = build_plan(users, marks={(1, "ai"): mark})
+
+    calls = plan.expected_calls()
+    # (3, None), (default, mark) and (default, None) are three separate summaries
+    assert calls["summary_sections"] == 3
+    assert calls["llm_requests"] == 2
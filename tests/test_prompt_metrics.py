@@ -0,0 +1,43 @@
+"""Each article reaching a prompt is counted once in newsflash_prompt_articles_total."""
+
+import pytest
+
+
+def _articles(topic, count=4):
+    return [{"title": f"{topic} headline {i}", "description": f"What happened in {topic} story {i}.",
+             "source": "Wire", "url": f"https://example.com/{topic}/{i}"} for i in range(count)]
+
+
+def _counted(outcome):
+    import metrics
+    series = metrics.registry.snapshot()["counters"].get("newsflash_prompt_articles_total", [])
+    return sum(entry["value"] for entry in series if entry["labels"].get("outcome") == outcome)
+
+
+@pytest.fixture
+def summarize(monkeypatch):
+    import metrics
+    import summarize
+    metrics.registry.reset()
+    yield summarize
+    metrics.registry.reset()
+
+
+def test_single_topic_counts_articles_once(summarize, monkeypatch):
+    monkeypatch.setattr(summarize, "_summarize_provider", lambda system, user, max_tokens=300: "• one")
+
+    summaries = summarize.summarize_many({"AI": _articles("AI")})
+
+    assert summaries == {"AI": "• one"}
+    assert _counted("kept") == 4
+
+
+def test_topics_retried_alone_count_articles_once(summarize, monkeypatch):
+    # The batch response has no usable topics, so both are retried one by one
+    monkeypatch.setattr(summarize, "_summarize_provider", lambda system, user, max_tokens=300:
+                        "{}" if max_tokens > 300 else "• alone")
+
+    summaries = summarize.summarize_many({"AI": _articles("AI"), "Space": _articles("Space")})
+
+    assert summaries == {"AI": "• alone", "Space": "• alone"}
+    assert _counted("kept") == 8
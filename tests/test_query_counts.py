@@ -0,0 +1,60 @@
+"""The scheduler's user lookups must not issue a query per user (N+1)."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def _seed(db, users, topics_per_user=3):
+    from app import NewsPreference, User
+    due = datetime.utcnow() - timedelta(minutes=1)
+    for i in range(users):
+        user = User(username=f"user{i}", email=f"user{i}@example.com", password_hash="x",
+                    email_enabled=True, next_send_at=due)
+        user.preferences = [NewsPreference(topic=f"Topic {t}") for t in range(topics_per_user)]
+        db.session.add(user)
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def _touch_topics(users):
+    return sum(len(user.preferences) for user in users)
+
+
+@pytest.mark.parametrize("users", [1, 10, 50])
+def test_due_users_with_topics_uses_two_queries(app_db, users):
+    from app import count_queries, due_users_with_topics
+    _seed(app_db, users)
+
+    with count_queries() as queries:
+        loaded = due_users_with_topics()
+        topics = _touch_topics(loaded)
+
+    assert len(loaded) == users
+    assert topics == users * 3
+    assert queries["count"] == 2
+
+
+@pytest.mark.parametrize("users", [1, 10, 50])
+def test_users_with_topics_uses_two_queries(app_db, users):
+    from app import User, count_queries, users_with_topics
+    _seed(app_db, users)
+    ids = [user_id for (user_id,) in app_db.session.query(User.id)]
+    app_db.session.expunge_all()
+
+    with count_queries() as queries:
+        loaded = users_with_topics(ids)
+        topics = _touch_topics(loaded)
+
+    assert len(loaded) == users
+    assert topics == users * 3
+    assert queries["count"] == 2
+
+
+def test_users_with_topics_without_ids_skips_the_database(app_db):
+    from app import count_queries, users_with_topics
+
+    with count_queries() as queries:
+        assert users_with_topics([]) == []
+
+    assert queries["count"] == 0
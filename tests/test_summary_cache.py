@@ -0,0 +1,22 @@
+"""On-disk eviction of the summary cache must follow use, including memory hits."""
+
+import time
+
+import summary_cache
+from summary_cache import SummaryCache
+
+
+def test_memory_hits_protect_keys_from_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr(summary_cache, "_EVICT_EVERY", 1)
+    cache = SummaryCache(path=str(tmp_path / "summaries.db"), max_entries=2, max_age=3600)
+
+    cache.put("hot", "• hot")
+    time.sleep(0.01)
+    cache.put("cold", "• cold")
+    time.sleep(0.01)
+    assert cache.get("hot") == "• hot"  # served from the in-memory layer
+    time.sleep(0.01)
+    cache.put("new", "• new")  # evicts down to two rows
+
+    rows = {key for (key,) in cache._conn.execute("SELECT key FROM summaries")}
+    assert rows == {"hot", "new"}
@@ -0,0 +1,194 @@
+"""
+Topic Cache
+Shares fetched articles and generated summaries between users who follow
+the same topic, so each distinct topic is fetched and summarized once per
+scheduling window instead of once per user.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+import metrics
+from article import as_articles, to_json
+from config import Config
+from fetch_news import fetch_news, topic_key
+from summarize import summarize_many, summarize_news
+
+
+class TopicCache:
+    """
+    Topic → articles and (topic, max_articles) → summary cache.
+
+    Articles are fetched once per topic at the largest size any caller asked
+    for; smaller requests are served by slicing that single fetch. Summaries
+    are keyed by the slice size since different slices summarize differently.
+
+    By default the cache only lives for one run. When a TTL and path are
+    configured it is also persisted to disk and reused by later runs until
+    entries expire.
+
+    The cache is safe to share between worker threads: concurrent requests
+    for the same key wait for the first one instead of repeating the call.
+    """
+
+    def __init__(self, ttl: int = None, path: str = None):
+        self.ttl = Config.TOPIC_CACHE_TTL if ttl is None else ttl
+        self.path = path if path is not None else Config.TOPIC_CACHE_PATH
+        self._planned: Dict[str, int] = {}
+        self._articles: Dict[str, dict] = {}
+        self._summaries: Dict[str, dict] = {}
+        self.stats = {"fetches": 0, "fetch_hits": 0, "summaries": 0, "summary_hits": 0}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._load()
+
+    def plan(self, requests: Iterable[Tuple[str, int]]) -> None:
+        """
+        Record upcoming (topic, max_articles) requests so the first fetch of a
+        topic is made at the largest size needed by anyone in the window.
+        """
+        for topic, max_articles in requests:
+            key = topic_key(topic)
+            size = max_articles or Config.MAX_ARTICLES
+            self._planned[key] = max(size, self._planned.get(key, 0))
+
+    def get_articles(self, topic: str, max_articles: int = None, since: str = None,
+                     raise_errors: bool = False) -> List[Dict[str, str]]:
+        """
+        Return up to max_articles articles for topic, fetching at most once.
+        With since, only articles published from then on (a separate entry).
+        With raise_errors, a failed fetch raises NewsFetchError and is not cached.
+        """
+        key = topic_key(topic)
+        size = max_articles or Config.MAX_ARTICLES
+        entry_key = f"{key}|from={since}" if since else key
+
+        with self._key_lock(f"articles:{entry_key}"):
+            entry = self._articles.get(entry_key)
+            if entry and self._fresh(entry) and entry["size"] >= size:
+                self._count("fetch_hits")
+                return entry["articles"][:size]
+
+            fetch_size = max(size, self._planned.get(key, 0))
+            articles = fetch_news(topic, max_articles=fetch_size, since=since, raise_errors=raise_errors)
+            self._count("fetches")
+            self._articles[entry_key] = {"size": fetch_size, "articles": articles, "created_at": time.time()}
+            return articles[:size]
+
+    def get_summary(self, topic: str, max_articles: int = None,
+                    articles: List[Dict[str, str]] = None) -> str:
+        """Return the summary for a topic slice, summarizing at most once."""
+        size = max_articles or Config.MAX_ARTICLES
+        key = f"{topic_key(topic)}|{size}"
+
+        with self._key_lock(f"summary:{key}"):
+            entry = self._summaries.get(key)
+            if entry and self._fresh(entry):
+                self._count("summary_hits")
+                return entry["summary"]
+
+            if articles is None:
+                articles = self.get_articles(topic, size)
+            summary = summarize_news(articles)
+            self._count("summaries")
+            self._summaries[key] = {"summary": summary, "created_at": time.time()}
+            return summary
+
+    def get_summaries(self, sections: List[Tuple[str, int, List[Dict[str, str]]]],
+                      variants: List[str] = None) -> List[str]:
+        """
+        Summaries for several (topic, max_articles, articles) sections at once.
+        Sections not yet cached are summarized together with summarize_many.
+        variants, if given, tells apart sections of the same topic and size
+        built from different article sets (e.g. "new since" slices).
+        """
+        variants = variants or [""] * len(sections)
+        keys = [f"{topic_key(topic)}|{size or Config.MAX_ARTICLES}" + (f"|{variant}" if variant else "")
+                for (topic, size, _), variant in zip(sections, variants)]
+        # Take the per-key locks in a stable order so concurrent callers can't deadlock
+        locks = [self._key_lock(f"summary:{key}") for key in sorted(set(keys))]
+        for lock in locks:
+            lock.acquire()
+        try:
+            batch: Dict[str, List[Dict[str, str]]] = {}
+            labels: Dict[str, str] = {}
+            for key, (topic, size, articles) in zip(keys, sections):
+                entry = self._summaries.get(key)
+                if entry and self._fresh(entry):
+                    self._count("summary_hits")
+                elif key not in labels:
+                    label = topic if topic not in batch else f"{topic} ({size})"
+                    if label in batch:
+                        label = f"{topic} ({size}, {len(batch)})"
+                    labels[key] = label
+                    batch[label] = articles
+
+            if batch:
+                results = summarize_many(batch)
+                for key, label in labels.items():
+                    self._count("summaries")
+                    self._summaries[key] = {"summary": results[label], "created_at": time.time()}
+
+            return [self._summaries[key]["summary"] for key in keys]
+        finally:
+            for lock in locks:
+                lock.release()
+
+    def save(self) -> None:
+        """Persist non-empty, unexpired entries when cross-run caching is enabled."""
+        if not self._persistent():
+            return
+        payload = {
+            "articles": {k: v for k, v in self._articles.items() if v["articles"] and self._fresh(v)},
+            "summaries": {k: v for k, v in self._summaries.items() if self._fresh(v)},
+        }
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, default=to_json)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not save topic cache: {e}")
+
+    def report(self) -> str:
+        """One-line summary of cache effectiveness for run logs."""
+        s = self.stats
+        return (f"Topic cache: {s['fetches']} fetches ({s['fetch_hits']} reused), "
+                f"{s['summaries']} summaries ({s['summary_hits']} reused)")
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+        cache = "topic_articles" if stat.startswith("fetch") else "topic_summary"
+        metrics.inc("newsflash_cache_requests_total", cache=cache,
+                    result="hit" if stat.endswith("_hits") else "miss")
+
+    def _persistent(self) -> bool:
+        return bool(self.path) and self.ttl > 0
+
+    def _fresh(self, entry: dict) -> bool:
+        if self.ttl <= 0:
+            return True
+        return time.time() - entry["created_at"] < self.ttl
+
+    def _load(self) -> None:
+        if not self._persistent() or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                payload = json.load(fh)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable topic cache: {e}")
+            return
+        self._articles = {k: dict(v, articles=as_articles(v["articles"]))
+                          for k, v in payload.get("articles", {}).items() if self._fresh(v)}
+        self._summaries = {k: v for k, v in payload.get("summaries", {}).items() if self._fresh(v)}
@@ -7,18 +7,22 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, session
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
-from fetch_news import fetch_news
-from summarize import summarize_news
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import metrics
 from config import Config
+from digest_store import DigestStore
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///newsflash.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///newsflash.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['SESSION_COOKIE_SECURE'] = False
@@ -28,6 +32,7 @@ app.config['SESSION_COOKIE_DOMAIN'] = None
 app.config['SESSION_COOKIE_PATH'] = '/'
 
 db = SQLAlchemy(app)
+digests = DigestStore()
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 login_manager.session_protection = None
@@ -39,10 +44,19 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
     preferred_email_time = db.Column(db.String(5), default='08:00')  # Format: HH:MM
+    timezone = db.Column(db.String(64), default='UTC')  # IANA name, e.g. Asia/Kolkata
     email_enabled = db.Column(db.Boolean, default=True)
+    next_send_at = db.Column(db.DateTime)  # Next scheduled digest, naive UTC
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     preferences = db.relationship('NewsPreference', backref='user', lazy=True, cascade='all, delete-orphan')
     
+    # The scheduler pulls due users with one range scan on this index
+    __table_args__ = (db.Index('ix_user_email_enabled_next_send_at', 'email_enabled', 'next_send_at'),)
+    
+    def schedule_next_send(self, after=None):
+        """Set next_send_at to the next preferred_email_time (in the user's time zone) after `after`."""
+        self.next_send_at = next_send_time(self.preferred_email_time, self.timezone, after)
+    
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
     
@@ -56,6 +70,104 @@ class NewsPreference(db.Model):
     max_articles = db.Column(db.Integer, default=10)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class SendJob(db.Model):
+    """One digest to send: a (user, send window) pair claimed by scheduler workers."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    window_at = db.Column(db.DateTime, nullable=False)  # The next_send_at being served, naive UTC
+    status = db.Column(db.String(10), nullable=False, default='pending')  # pending/running/sent/skipped/failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Retry backoff
+    lease_owner = db.Column(db.String(64))
+    lease_expires_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'window_at', name='uq_send_job_user_window'),
+        db.Index('ix_send_job_status_available_at', 'status', 'available_at'),
+    )
+
+class DeliveryMark(db.Model):
+    """High-water mark of what a user has been sent for one topic (incremental digests)."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    topic_key = db.Column(db.String(100), primary_key=True)  # Normalized topic, e.g. "tesla news"
+    last_published_at = db.Column(db.String(25), nullable=False)  # Newest publishedAt sent (ISO 8601)
+    seen_urls = db.Column(db.Text, nullable=False, default='[]')  # JSON: URLs sent at last_published_at
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+def parse_email_time(value, default='08:00'):
+    """Normalize an HH:MM string; returns default when it is missing or invalid."""
+    try:
+        return datetime.strptime((value or '').strip(), '%H:%M').strftime('%H:%M')
+    except ValueError:
+        return default
+
+def is_valid_timezone(name):
+    try:
+        ZoneInfo(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+
+def next_send_time(preferred_time, tz_name, after=None):
+    """
+    Next occurrence of preferred_time (HH:MM, local to tz_name) strictly after
+    `after` (naive UTC, default now), returned as naive UTC for the DB.
+    """
+    tz = ZoneInfo(tz_name) if tz_name and is_valid_timezone(tz_name) else timezone.utc
+    after_utc = (after or datetime.utcnow()).replace(tzinfo=timezone.utc)
+    local_now = after_utc.astimezone(tz)
+    send_time = datetime.strptime(parse_email_time(preferred_time), '%H:%M').time()
+    
+    candidate = datetime.combine(local_now.date(), send_time, tzinfo=tz)
+    while candidate.astimezone(timezone.utc) <= after_utc:
+        candidate = datetime.combine(candidate.date() + timedelta(days=1), send_time, tzinfo=tz)
+    return candidate.astimezone(timezone.utc).replace(tzinfo=None)
+
+def due_users_with_topics(now=None):
+    """
+    Users whose next send is due, with their NewsPreference rows loaded in the
+    same batch (two queries total, independent of the number of users).
+    """
+    now = now or datetime.utcnow()
+    return (User.query
+            .options(selectinload(User.preferences))
+            .filter(User.email_enabled == True, User.next_send_at <= now)
+            .order_by(User.next_send_at)
+            .all())
+
+def users_with_topics(user_ids):
+    """Users by id with their NewsPreference rows loaded (two queries total)."""
+    if not user_ids:
+        return []
+    return (User.query
+            .options(selectinload(User.preferences))
+            .filter(User.id.in_(list(user_ids)))
+            .all())
+
+@contextmanager
+def count_queries():
+    """
+    Count SQL statements executed on the app's engine inside the block, so
+    N+1 regressions show up in logs and tests:
+    
+        with count_queries() as queries:
+            due_users_with_topics()
+        assert queries['count'] <= 2
+    """
+    counter = {'count': 0}
+    
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        counter['count'] += 1
+    
+    event.listen(db.engine, 'before_cursor_execute', _on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', _on_execute)
+
 @login_manager.user_loader
 def load_user(user_id):
     return db.session.get(User, int(user_id))
@@ -75,6 +187,11 @@ def whoami():
         'username': getattr(current_user, 'username', None)
     }
 
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint: stage latencies, upstream calls, cache hits, tokens."""
+    return Response(metrics.registry.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/signup', methods=['GET', 'POST'])
 def signup():
     if current_user.is_authenticated:
@@ -84,9 +201,13 @@ def signup():
         username = request.form.get('username')
         email = request.form.get('email')
         password = request.form.get('password')
-        preferred_time = request.form.get('preferred_email_time', '08:00')
+        preferred_time = parse_email_time(request.form.get('preferred_email_time'))
+        user_timezone = request.form.get('timezone') or 'UTC'
         email_enabled = request.form.get('email_enabled') == 'on'
         
+        if not is_valid_timezone(user_timezone):
+            user_timezone = 'UTC'
+        
         if User.query.filter_by(username=username).first():
             flash('Username already exists', 'danger')
             return redirect(url_for('signup'))
@@ -95,8 +216,10 @@ def signup():
             flash('Email already registered', 'danger')
             return redirect(url_for('signup'))
         
-        user = User(username=username, email=email, preferred_email_time=preferred_time, email_enabled=email_enabled)
+        user = User(username=username, email=email, preferred_email_time=preferred_time,
+                    timezone=user_timezone, email_enabled=email_enabled)
         user.set_password(password)
+        user.schedule_next_send()
         db.session.add(user)
         
         # Add default topic
@@ -143,7 +266,7 @@ def logout():
 def dashboard():
     # Debug: check auth state
     print(f"[DEBUG] dashboard: is_authenticated={current_user.is_authenticated}, user_id={getattr(current_user, 'id', None)}")
-    preferences = NewsPreference.query.filter_by(user_id=current_user.id).all()
+    preferences = NewsPreference.query.filter_by(user_id=current_user.id).order_by(NewsPreference.created_at).all()
     topic_choices = [
         "Technology",
         "Business",
@@ -206,19 +329,24 @@ def view_news(topic_id):
         return redirect(url_for('dashboard'))
     
     try:
-        # Fetch and summarize
-        articles = fetch_news(topic=pref.topic, max_articles=pref.max_articles)
+        # Serve the last-known digest; refresh in the background when stale
+        digest, stale = digests.get(pref.topic, pref.max_articles, wait_seconds=Config.DIGEST_COLD_WAIT)
         
-        if not articles:
+        if digest is None:
+            return render_template('news.html', topic=pref.topic, summary=None,
+                                   articles=[], pending=True, stale=False, updated_at=None)
+        
+        if not digest['articles']:
             flash(f'No articles found for "{pref.topic}"', 'warning')
             return redirect(url_for('dashboard'))
         
-        summary = summarize_news(articles)
-        
         return render_template('news.html', 
                              topic=pref.topic, 
-                             summary=summary, 
-                             articles=articles)
+                             summary=digest['summary'], 
+                             articles=digest['articles'],
+                             pending=False,
+                             stale=stale,
+                             updated_at=datetime.fromtimestamp(digest['fetched_at']))
     
     except Exception as e:
         flash(f'Error fetching news: {str(e)}', 'danger')
@@ -228,11 +356,18 @@ def view_news(topic_id):
 @login_required
 def profile():
     if request.method == 'POST':
-        preferred_time = request.form.get('preferred_email_time')
+        preferred_time = parse_email_time(request.form.get('preferred_email_time'), current_user.preferred_email_time)
+        user_timezone = request.form.get('timezone') or current_user.timezone or 'UTC'
         email_enabled = request.form.get('email_enabled') == 'on'
         
+        if not is_valid_timezone(user_timezone):
+            flash(f'Unknown time zone "{user_timezone}"', 'danger')
+            return redirect(url_for('profile'))
+        
         current_user.preferred_email_time = preferred_time
+        current_user.timezone = user_timezone
         current_user.email_enabled = email_enabled
+        current_user.schedule_next_send()
         db.session.commit()
         
         flash('Email preferences updated successfully!', 'success')
@@ -0,0 +1,107 @@
+"""
+Delivery Marks for incremental digests
+A high-water mark per (user, topic): the newest publishedAt the user has been
+sent for that topic, plus the URLs published at exactly that instant. The
+scheduler fetches each topic only from the oldest mark among its subscribers
+and every digest contains only articles newer than the reader's own mark.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from app import DeliveryMark
+from dedup import canonical_url
+from job_queue import dialect_insert
+
+# URLs kept per mark; only articles published at the mark's instant are checked against them
+_MAX_SEEN = 200
+
+
+class Mark(NamedTuple):
+    """Newest publishedAt delivered (NewsAPI ISO 8601 string) and the URLs delivered at it."""
+    last_published_at: str
+    seen: Tuple[str, ...] = ()
+
+
+def _published(article: Dict[str, str]) -> str:
+    value = article.get("publishedAt") or ""
+    return value if value[:1].isdigit() else ""
+
+
+def is_new(article: Dict[str, str], mark: Optional[Mark]) -> bool:
+    """True if the article was published after the mark (or at it, but not yet sent)."""
+    if mark is None:
+        return True
+    published = _published(article)
+    if published and published > mark.last_published_at:
+        return True
+    # NewsAPI's "from" is inclusive; articles at the boundary (or undated) are new unless already sent
+    if not published or published == mark.last_published_at:
+        return canonical_url(article.get("url")) not in mark.seen
+    return False
+
+
+def new_articles(articles: List[Dict[str, str]], mark: Optional[Mark]) -> List[Dict[str, str]]:
+    """Articles not yet sent under this mark, in their original order."""
+    return [article for article in articles if is_new(article, mark)]
+
+
+def advance(mark: Optional[Mark], delivered: Iterable[Dict[str, str]]) -> Optional[Mark]:
+    """Mark after sending `delivered` on top of `mark`."""
+    delivered = list(delivered)
+    newest = max((_published(article) for article in delivered), default="")
+    if mark is not None and mark.last_published_at >= newest:
+        newest, seen = mark.last_published_at, list(mark.seen)
+    elif newest:
+        seen = []
+    else:
+        return mark
+    for article in delivered:
+        published = _published(article)
+        url = canonical_url(article.get("url"))
+        if url and (published == newest or not published) and url not in seen:
+            seen.append(url)
+    return Mark(newest, tuple(seen[-_MAX_SEEN:]))
+
+
+def load_marks(user_ids: Iterable[int]) -> Dict[Tuple[int, str], Mark]:
+    """Marks of the given users, keyed by (user_id, topic key)."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    marks = {}
+    # Chunked to stay under SQLite's bound-parameter limit on large dry runs
+    for start in range(0, len(user_ids), 500):
+        rows = DeliveryMark.query.filter(DeliveryMark.user_id.in_(user_ids[start:start + 500])).all()
+        for row in rows:
+            marks[(row.user_id, row.topic_key)] = Mark(row.last_published_at,
+                                                       tuple(json.loads(row.seen_urls or "[]")))
+    return marks
+
+
+def save_marks(engine, user_id: int, marks: Dict[str, Mark]) -> None:
+    """
+    Upsert a user's marks after a successful send. Uses its own engine
+    connection so it can be called from the scheduler's send workers.
+    """
+    if not marks:
+        return
+    now = datetime.utcnow()
+    rows = [{"user_id": user_id, "topic_key": key, "last_published_at": mark.last_published_at,
+             "seen_urls": json.dumps(list(mark.seen)), "updated_at": now}
+            for key, mark in marks.items() if mark is not None]
+    if not rows:
+        return
+    statement = dialect_insert(DeliveryMark.__table__, engine)
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "topic_key"],
+        set_={"last_published_at": statement.excluded.last_published_at,
+              "seen_urls": statement.excluded.seen_urls,
+              "updated_at": statement.excluded.updated_at},
+    )
+    with engine.begin() as conn:
+        conn.execute(statement, rows)
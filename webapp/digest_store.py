@@ -0,0 +1,106 @@
+"""
+Digest Store for the News-Flash web app
+Keeps the last-known articles and summary per (topic, max_articles) in memory
+and refreshes them on a background pool, so /news/<topic_id> never waits on
+NewsAPI or the LLM when a previous digest exists (stale-while-revalidate).
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Optional, Tuple
+import metrics
+from config import Config
+from fetch_news import fetch_news, topic_key
+from summarize import summarize_news
+
+
+class DigestStore:
+    """
+    In-process digest cache with background refresh.
+
+    A digest is fresh for DIGEST_TTL seconds; after that it is still served
+    but marked stale and a refresh is started. Refreshes of the same key are
+    coalesced, so many simultaneous viewers trigger one upstream fetch.
+    An empty refresh (no articles, or NewsAPI unreachable) is only trusted
+    for DIGEST_EMPTY_TTL seconds, so the next view soon tries again.
+    """
+
+    def __init__(self, ttl: int = None, workers: int = None, empty_ttl: int = None):
+        self.ttl = ttl if ttl is not None else Config.DIGEST_TTL
+        self.empty_ttl = empty_ttl if empty_ttl is not None else Config.DIGEST_EMPTY_TTL
+        self._digests: Dict[Tuple[str, int], dict] = {}
+        self._in_flight: Dict[Tuple[str, int], Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or Config.DIGEST_REFRESH_WORKERS,
+            thread_name_prefix="digest-refresh",
+        )
+
+    @staticmethod
+    def _key(topic: str, max_articles: int) -> Tuple[str, int]:
+        return topic_key(topic), max_articles or Config.MAX_ARTICLES
+
+    def lookup(self, topic: str, max_articles: int) -> Tuple[Optional[dict], bool]:
+        """
+        Return (digest, is_stale) without blocking. digest is None on a cold
+        miss; the caller decides whether to refresh and how long to wait.
+        """
+        with self._lock:
+            digest = self._digests.get(self._key(topic, max_articles))
+        if digest is None:
+            return None, True
+        return digest, time.time() >= digest["expires_at"]
+
+    def refresh(self, topic: str, max_articles: int) -> Future:
+        """Start a background refresh, or join the one already running for this key."""
+        key = self._key(topic, max_articles)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._executor.submit(self._load, key, topic, max_articles)
+                self._in_flight[key] = future
+            return future
+
+    def get(self, topic: str, max_articles: int, wait_seconds: float = 0) -> Tuple[Optional[dict], bool]:
+        """
+        Serve the last-known digest immediately, refreshing in the background
+        when it is missing or stale. On a cold miss, wait up to wait_seconds
+        for the first load.
+
+        Returns:
+            tuple: (digest or None if still loading, is_stale)
+        """
+        digest, stale = self.lookup(topic, max_articles)
+        result = "miss" if digest is None else "stale" if stale else "hit"
+        metrics.inc("newsflash_cache_requests_total", cache="digest", result=result)
+        if digest is not None and not stale:
+            return digest, False
+
+        future = self.refresh(topic, max_articles)
+        if digest is None and wait_seconds > 0:
+            wait([future], timeout=wait_seconds)
+            return self.lookup(topic, max_articles)
+        return digest, stale
+
+    def _load(self, key: Tuple[str, int], topic: str, max_articles: int) -> dict:
+        try:
+            articles = fetch_news(topic=topic, max_articles=max_articles)
+            summary = summarize_news(articles) if articles else None
+            now = time.time()
+            digest = {"articles": articles, "summary": summary, "fetched_at": now,
+                      "expires_at": now + (self.ttl if articles else self.empty_ttl)}
+            with self._lock:
+                previous = self._digests.get(key)
+                if articles or previous is None:
+                    self._digests[key] = digest
+                else:
+                    # Keep serving the previous digest, but retry soon instead of after a full TTL
+                    previous["expires_at"] = digest["expires_at"]
+            return digest
+        except Exception as e:
+            print(f"✗ Background refresh failed for {topic}: {str(e)}")
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
@@ -0,0 +1,194 @@
+"""
+Durable Send-Job Queue for the News-Flash scheduler
+One send_job row per (user, send window) in newsflash.db. Scheduler processes
+claim jobs with a time-limited lease, record the outcome of each send, and
+pick up jobs left behind by a crashed run once their lease expires.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy import and_, case, func, or_, select, update
+from app import db, SendJob, due_users_with_topics
+from config import Config
+
+
+def dialect_insert(table, engine=None):
+    """
+    INSERT for the database behind engine (default: the app's), with
+    on_conflict_do_nothing/on_conflict_do_update on both SQLite and PostgreSQL.
+    """
+    if (engine or db.engine).dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def _insert_ignore(table):
+    """INSERT that skips rows already present for the same (user, window)."""
+    return dialect_insert(table).on_conflict_do_nothing(index_elements=["user_id", "window_at"])
+
+
+class SendJobQueue:
+    """
+    Lease-based job queue on the send_job table.
+
+    Every state change is a single UPDATE guarded by the current status and
+    lease owner, so several scheduler processes can work the same window
+    without sending a digest twice. Job updates use their own engine
+    connections and are safe to call from pipeline worker threads.
+
+    Example:
+        with SendJobQueue() as queue:
+            queue.enqueue_due()
+            for job_id, user_id, window_at in queue.claim():
+                ...
+                queue.complete(job_id)
+    """
+
+    def __init__(self, lease_seconds: int = None, max_attempts: int = None, retry_delay: int = None):
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:12]}"
+        self.lease = timedelta(seconds=lease_seconds or Config.SEND_JOB_LEASE)
+        self.max_attempts = max_attempts or Config.SEND_JOB_MAX_ATTEMPTS
+        self.retry_delay = retry_delay if retry_delay is not None else Config.SEND_JOB_RETRY_DELAY
+        self.table = SendJob.__table__
+        # Bound once (inside the app context) so worker threads can record outcomes
+        self.engine = db.engine
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    def __enter__(self):
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._renew_leases, name="send-job-heartbeat", daemon=True)
+        self._heartbeat.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._heartbeat.join()
+        self.release("run ended before the job finished")
+
+    def enqueue_due(self, now: datetime = None) -> int:
+        """
+        Create a job for every user whose next_send_at has passed and advance
+        their schedule in the same transaction. Returns the number of users due.
+        """
+        now = now or datetime.utcnow()
+        users = due_users_with_topics(now)
+        if users:
+            rows = [{"user_id": user.id, "window_at": user.next_send_at, "status": "pending",
+                     "attempts": 0, "available_at": now, "created_at": now, "updated_at": now}
+                    for user in users]
+            db.session.execute(_insert_ignore(self.table), rows)
+            for user in users:
+                user.schedule_next_send(after=now)
+        db.session.commit()
+        return len(users)
+
+    def claim(self, limit: int = None) -> List[Tuple[int, int, datetime]]:
+        """
+        Atomically lease up to `limit` runnable jobs: pending jobs whose retry
+        delay has passed, and running jobs whose lease expired (crashed runs).
+
+        Returns:
+            list: (job_id, user_id, window_at) tuples owned by this queue
+        """
+        t = self.table
+        now = datetime.utcnow()
+        runnable = or_(
+            and_(t.c.status == "pending", t.c.available_at <= now),
+            and_(t.c.status == "running", t.c.lease_expires_at < now),
+        )
+        with self.engine.begin() as conn:
+            # Jobs abandoned mid-send on their last attempt are not retried again
+            conn.execute(
+                update(t)
+                .where(t.c.status == "running", t.c.lease_expires_at < now,
+                       t.c.attempts >= self.max_attempts)
+                .values(status="failed", lease_owner=None, updated_at=now,
+                        last_error=func.coalesce(t.c.last_error, "lease expired"))
+            )
+            candidates = (select(t.c.id)
+                          .where(runnable, t.c.attempts < self.max_attempts)
+                          .order_by(t.c.available_at, t.c.id)
+                          .limit(limit or Config.SEND_JOB_BATCH)
+                          .scalar_subquery())
+            conn.execute(
+                update(t)
+                .where(t.c.id.in_(candidates), runnable)
+                .values(status="running", lease_owner=self.owner, lease_expires_at=now + self.lease,
+                        attempts=t.c.attempts + 1, updated_at=now)
+            )
+            rows = conn.execute(
+                select(t.c.id, t.c.user_id, t.c.window_at)
+                .where(t.c.lease_owner == self.owner, t.c.status == "running")
+                .order_by(t.c.id)
+            ).all()
+        return [tuple(row) for row in rows]
+
+    def complete(self, job_id: int, status: str = "sent", note: str = None) -> bool:
+        """Mark a leased job finished ('sent' or 'skipped'); False if the lease was lost."""
+        t = self.table
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(t)
+                .where(t.c.id == job_id, t.c.lease_owner == self.owner, t.c.status == "running")
+                .values(status=status, lease_owner=None, lease_expires_at=None,
+                        last_error=note, updated_at=datetime.utcnow())
+            )
+        return result.rowcount == 1
+
+    def fail(self, job_id: int, error: str) -> bool:
+        """Record a failed attempt; the job is retried after a delay until attempts run out."""
+        t = self.table
+        now = datetime.utcnow()
+        exhausted = t.c.attempts >= self.max_attempts
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(t)
+                .where(t.c.id == job_id, t.c.lease_owner == self.owner, t.c.status == "running")
+                .values(status=case((exhausted, "failed"), else_="pending"),
+                        available_at=now + timedelta(seconds=self.retry_delay),
+                        lease_owner=None, lease_expires_at=None,
+                        last_error=(error or "")[:500], updated_at=now)
+            )
+        return result.rowcount == 1
+
+    def release(self, reason: str) -> int:
+        """Fail every job this queue still holds, e.g. users whose topics errored."""
+        t = self.table
+        with self.engine.begin() as conn:
+            job_ids = conn.execute(
+                select(t.c.id).where(t.c.lease_owner == self.owner, t.c.status == "running")
+            ).scalars().all()
+        for job_id in job_ids:
+            self.fail(job_id, reason)
+        return len(job_ids)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status, for the end-of-run report."""
+        t = self.table
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(t.c.status, func.count()).group_by(t.c.status)).all()
+        return {status: count for status, count in rows}
+
+    def _renew_leases(self) -> None:
+        """Extend this queue's leases while the run is alive so long runs are not reclaimed."""
+        t = self.table
+        interval = max(1.0, self.lease.total_seconds() / 3)
+        while not self._stop.wait(interval):
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(
+                        update(t)
+                        .where(t.c.lease_owner == self.owner, t.c.status == "running")
+                        .values(lease_expires_at=datetime.utcnow() + self.lease)
+                    )
+            except Exception as e:
+                print(f"⚠️  Could not renew send-job leases: {str(e)}")
@@ -1,5 +1,8 @@
 """
 Database Migration: Add Email Scheduling Fields
+(preferred time, enabled flag, time zone and indexed next_send_at)
+plus the send_job table used by the scheduler's durable job queue and the
+delivery_mark table used for incremental ("only new") digests.
 Run this script once to add new fields to existing database.
 """
 
@@ -7,7 +10,35 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from app import app, db, User
+from datetime import datetime
+from app import app, db, User, SendJob, DeliveryMark, is_valid_timezone
+
+
+def server_timezone():
+    """
+    IANA name of this server's local time zone, which the scheduler used for
+    every user before per-user time zones existed.
+    """
+    candidates = [os.environ.get("TZ", "").lstrip(":")]
+    try:
+        with open("/etc/timezone") as fh:
+            candidates.append(fh.read().strip())
+    except OSError:
+        pass
+    localtime = os.path.realpath("/etc/localtime")
+    if "zoneinfo/" in localtime:
+        candidates.append(localtime.split("zoneinfo/", 1)[1])
+    for name in candidates:
+        if name and is_valid_timezone(name):
+            return name
+    
+    # No zone name available: fall back to the current whole-hour offset (Etc/GMT signs are inverted)
+    offset = datetime.now().astimezone().utcoffset()
+    hours, remainder = divmod(int(offset.total_seconds()), 3600)
+    if remainder == 0 and hours != 0:
+        return f"Etc/GMT{-hours:+d}"
+    return "UTC"
+
 
 def migrate_database():
     """Add email scheduling fields to User table."""
@@ -37,6 +68,47 @@ def migrate_database():
                         print("✓ 'email_enabled' already exists")
                     else:
                         print(f"  Note: {str(e)}")
+                
+                try:
+                    conn.execute(db.text("ALTER TABLE user ADD COLUMN timezone VARCHAR(64) DEFAULT 'UTC'"))
+                    print("✓ Added 'timezone'")
+                    # Existing users were scheduled in server local time; keep their delivery time
+                    local_zone = server_timezone()
+                    conn.execute(db.text("UPDATE user SET timezone = :tz"), {"tz": local_zone})
+                    print(f"✓ Existing users set to the server time zone ({local_zone})")
+                except Exception as e:
+                    if "duplicate column" in str(e).lower() or "already exists" in str(e).lower():
+                        print("✓ 'timezone' already exists")
+                    else:
+                        print(f"  Note: {str(e)}")
+                
+                try:
+                    conn.execute(db.text("ALTER TABLE user ADD COLUMN next_send_at DATETIME"))
+                    print("✓ Added 'next_send_at'")
+                except Exception as e:
+                    if "duplicate column" in str(e).lower() or "already exists" in str(e).lower():
+                        print("✓ 'next_send_at' already exists")
+                    else:
+                        print(f"  Note: {str(e)}")
+                
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_user_email_enabled_next_send_at "
+                    "ON user (email_enabled, next_send_at)"
+                ))
+                print("✓ Index on (email_enabled, next_send_at) ready")
+            
+            SendJob.__table__.create(db.engine, checkfirst=True)
+            print("✓ 'send_job' table ready")
+            
+            DeliveryMark.__table__.create(db.engine, checkfirst=True)
+            print("✓ 'delivery_mark' table ready")
+            
+            # Backfill the schedule for users created before next_send_at existed
+            pending = User.query.filter(User.next_send_at.is_(None)).all()
+            for user in pending:
+                user.schedule_next_send()
+            db.session.commit()
+            print(f"✓ Scheduled next send for {len(pending)} users")
             
             print("\n✅ Database migration successful!")
             print("All users now have email scheduling fields.")
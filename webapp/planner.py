@@ -0,0 +1,303 @@
+"""
+Topic-Major Send Planner
+Turns the due users' NewsPreference rows into a plan keyed by topic: each
+distinct topic is fetched and summarized once, in order of subscriber count,
+and each user's digest is sent as soon as all of their topics are ready.
+With delivery marks, a topic is fetched only from the oldest mark among its
+subscribers and each digest holds only what its reader has not been sent.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import math
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+from config import Config
+from dedup import dedup_sections
+from delivery_marks import Mark, advance, new_articles
+from emailer import BulkMailer
+from fetch_news import NewsFetchError, topic_key
+from pipeline import Many
+from topic_cache import TopicCache
+
+
+def _variant(mark: Optional[Mark]) -> str:
+    """Summary cache variant for a "new since mark" slice ("" for a full slice)."""
+    if mark is None:
+        return ""
+    return f"from={mark.last_published_at}#{zlib.crc32(chr(10).join(mark.seen).encode('utf-8')):08x}"
+
+
+class TopicPlan:
+    """One distinct topic in the window and everyone waiting on it."""
+
+    def __init__(self, key: str, topic: str):
+        self.key = key
+        self.topic = topic
+        self.sizes = set()
+        self.slices = set()  # (max_articles, subscriber's Mark or None)
+        self.subscribers: List[int] = []
+        self.articles: List[Dict[str, str]] = []
+        self.summaries: Dict[Tuple[int, Optional[Mark]], str] = {}
+        self.error: Optional[str] = None  # Set when the fetch failed (not when it found nothing)
+
+    @property
+    def fetch_size(self) -> int:
+        """Largest slice anyone asked for; smaller slices are cut from this fetch."""
+        return max(self.sizes)
+
+    @property
+    def since(self) -> Optional[str]:
+        """Oldest subscriber mark, used as NewsAPI "from" (None if anyone has no mark yet)."""
+        marks = [mark for _, mark in self.slices]
+        if not marks or None in marks:
+            return None
+        return min(mark.last_published_at for mark in marks)
+
+
+class UserPlan:
+    """
+    One due user's digest: (topic key, topic label, max_articles) per section,
+    the user's delivery mark per topic key, and the marks to store once sent.
+    """
+
+    def __init__(self, user_id: int, username: str, email: str):
+        self.user_id = user_id
+        self.username = username
+        self.email = email
+        self.sections: List[Tuple[str, str, int]] = []
+        self.marks: Dict[str, Mark] = {}
+        self.delivered: Dict[str, Mark] = {}
+
+
+class SendPlan:
+    """Plan for one scheduling window, with topics in priority order."""
+
+    def __init__(self, topics: List[TopicPlan], users: List[UserPlan]):
+        self.topics = topics
+        self.users = users
+
+    def expected_calls(self) -> Dict[str, int]:
+        """
+        Expected upstream calls for this plan versus a per-user run.
+
+        Every (size, mark) slice of a topic is its own summary section, and
+        PlanRunner batches up to SUMMARY_BATCH_MAX_TOPICS sections per LLM
+        request, so llm_requests is an estimate: the batch token budget can
+        split a batch further, and caches only lower it.
+        """
+        per_user_sections = sum(len(user.sections) for user in self.users)
+        sections = sum(len(topic.slices) for topic in self.topics)
+        # The mailer hands out its SMTP_CONNECTIONS pooled connections in turn
+        pool = min(max(1, Config.SMTP_CONNECTIONS), len(self.users))
+        per_connection = max(1, Config.SMTP_MAX_MESSAGES_PER_CONNECTION)
+        connections = 0
+        if pool:
+            # Each pooled connection is recycled after per_connection messages
+            connections = pool * math.ceil(math.ceil(len(self.users) / pool) / per_connection)
+        return {
+            "newsapi_requests": len(self.topics),
+            "summary_sections": sections,
+            "llm_requests": math.ceil(sections / max(1, Config.SUMMARY_BATCH_MAX_TOPICS)),
+            "smtp_messages": len(self.users),
+            "smtp_connections": connections,
+            "per_user_newsapi_requests": per_user_sections,
+            "per_user_llm_requests": per_user_sections,
+        }
+
+    def describe(self) -> str:
+        """Human-readable dry-run report for capacity planning."""
+        calls = self.expected_calls()
+        lines = [
+            f"Send plan: {len(self.users)} users, {len(self.topics)} distinct topics",
+            "",
+            f"  {'#':>3}  {'topic':<30} {'subscribers':>11} {'fetch':>6}  {'from':<20}  slices",
+        ]
+        for rank, topic in enumerate(self.topics, 1):
+            slices = ",".join(str(size) for size in sorted(topic.sizes))
+            lines.append(f"  {rank:>3}  {topic.topic[:30]:<30} {len(topic.subscribers):>11} "
+                         f"{topic.fetch_size:>6}  {topic.since or '-':<20}  {slices}")
+        lines += [
+            "",
+            "Expected upstream calls (estimates; caches only lower them):",
+            f"  NewsAPI requests : {calls['newsapi_requests']} (per-user run: {calls['per_user_newsapi_requests']})",
+            f"  LLM requests     : ~{calls['llm_requests']} for {calls['summary_sections']} summary sections, "
+            f"up to {max(1, Config.SUMMARY_BATCH_MAX_TOPICS)} per request "
+            f"(per-user run: {calls['per_user_llm_requests']})",
+            f"  SMTP messages    : {calls['smtp_messages']} over ~{calls['smtp_connections']} connections",
+        ]
+        return "\n".join(lines)
+
+
+def build_plan(users, marks: Dict[Tuple[int, str], Mark] = None) -> SendPlan:
+    """
+    Build a topic-major plan from User rows with their preferences loaded.
+    Topics are ordered by subscriber count (ties by name) so the most widely
+    shared work is done first.
+
+    marks, if given, maps (user id, topic key) to that user's delivery mark
+    (see delivery_marks.load_marks); digests then only include newer articles.
+    """
+    marks = marks or {}
+    topics: Dict[str, TopicPlan] = {}
+    user_plans: List[UserPlan] = []
+
+    for user in users:
+        plan = UserPlan(user.id, user.username, user.email)
+        for pref in user.preferences:
+            key = topic_key(pref.topic)
+            size = pref.max_articles or Config.MAX_ARTICLES
+            topic = topics.get(key)
+            if topic is None:
+                topic = topics[key] = TopicPlan(key, pref.topic)
+            mark = marks.get((user.id, key))
+            topic.sizes.add(size)
+            topic.slices.add((size, mark))
+            if mark is not None:
+                plan.marks[key] = mark
+            if not topic.subscribers or topic.subscribers[-1] != len(user_plans):
+                topic.subscribers.append(len(user_plans))
+            plan.sections.append((key, pref.topic, size))
+        if plan.sections:
+            user_plans.append(plan)
+        else:
+            print(f"  No topics set for {user.username}, skipping")
+
+    ordered = sorted(topics.values(), key=lambda t: (-len(t.subscribers), t.key))
+    return SendPlan(ordered, user_plans)
+
+
+class PlanRunner:
+    """
+    Stage functions for running a SendPlan on a StagedPipeline:
+    fetch (per topic) → summarize (topics batched, releases ready users) → send (per user).
+
+    on_done, if given, is called from the send workers with
+    (user, "sent" | "skipped" | "failed", error) for every user that reaches
+    the send stage. "skipped" means NewsAPI really had nothing (new) for the
+    user; a failed topic fetch fails the user so the job is retried.
+    """
+
+    def __init__(self, plan: SendPlan, cache: TopicCache, mailer: BulkMailer,
+                 on_done: Callable[[UserPlan, str, Optional[str]], None] = None):
+        self.plan = plan
+        self.cache = cache
+        self.mailer = mailer
+        self.on_done = on_done or (lambda user, status, error: None)
+        self._lock = threading.Lock()
+        self._remaining = [len({key for key, _, _ in user.sections}) for user in plan.users]
+        self._topics = {topic.key: topic for topic in plan.topics}
+        # Topics whose slices wait to be summarized together (see summarize_topic)
+        self._pending: List[Tuple[TopicPlan, list, list]] = []
+        self._pending_sections = 0
+        self._arrived = 0
+        cache.plan((topic.topic, topic.fetch_size) for topic in plan.topics)
+
+    def fetch_topic(self, topic: TopicPlan) -> TopicPlan:
+        try:
+            topic.articles = self.cache.get_articles(topic.topic, topic.fetch_size, since=topic.since,
+                                                     raise_errors=True)
+        except NewsFetchError as e:
+            # Subscribers are failed (and retried later), not skipped as if there were no news
+            topic.error = str(e)
+            print(f"  ✗ Fetch failed for {topic.topic} ({topic.error}); "
+                  f"{len(topic.subscribers)} subscribers will be retried")
+            return topic
+        print(f"  Found {len(topic.articles)} articles for {topic.topic} "
+              f"({len(topic.subscribers)} subscribers" + (f", from {topic.since})" if topic.since else ")"))
+        return topic
+
+    def summarize_topic(self, topic: TopicPlan) -> Many:
+        """
+        Queue one topic's slices for summarizing, then release users whose topics are all done.
+
+        Slices from several topics are summarized together, so one LLM request
+        covers up to SUMMARY_BATCH_MAX_TOPICS of them: queued slices are sent
+        once that many are waiting or the last topic has been fetched. Topics
+        with nothing to summarize (no new articles, failed fetch) never wait.
+        """
+        slices, sections = [], []
+        for size, mark in sorted(topic.slices, key=lambda s: (s[0], _variant(s[1]))):
+            articles = new_articles(topic.articles, mark)[:size]
+            # Nothing new for this slice: nothing to summarize
+            if articles:
+                slices.append((size, mark))
+                sections.append((topic.topic, size, articles))
+
+        batch = []
+        with self._lock:
+            self._arrived += 1
+            if sections:
+                self._pending.append((topic, slices, sections))
+                self._pending_sections += len(sections)
+            if (self._arrived == len(self.plan.topics)
+                    or self._pending_sections >= max(1, Config.SUMMARY_BATCH_MAX_TOPICS)):
+                batch, self._pending, self._pending_sections = self._pending, [], 0
+
+        if batch:
+            all_sections = [section for _, _, topic_sections in batch for section in topic_sections]
+            variants = [_variant(mark) for _, topic_slices, _ in batch for _, mark in topic_slices]
+            summaries = iter(self.cache.get_summaries(all_sections, variants))
+            for done, topic_slices, _ in batch:
+                done.summaries = {slice_: next(summaries) for slice_ in topic_slices}
+
+        ready = Many()
+        with self._lock:
+            for done in [done for done, _, _ in batch] + ([] if sections else [topic]):
+                for index in done.subscribers:
+                    self._remaining[index] -= 1
+                    if self._remaining[index] == 0:
+                        ready.append(self.plan.users[index])
+        return ready
+
+    def send_user(self, user: UserPlan):
+        """Assemble and send one user's digest from the finished topics."""
+        try:
+            return self._send_user(user)
+        except Exception as e:
+            self.on_done(user, "failed", str(e))
+            raise
+
+    def _send_user(self, user: UserPlan):
+        errors = sorted({self._topics[key].topic for key, _, _ in user.sections if self._topics[key].error})
+        if errors:
+            print(f"  ✗ Not sending to {user.username}: fetch failed for {', '.join(errors)}")
+            self.on_done(user, "failed", f"fetch failed for {', '.join(errors)}")
+            return None
+
+        sections = []
+        fetched = False
+        for key, label, size in user.sections:
+            topic = self._topics[key]
+            mark = user.marks.get(key)
+            articles = new_articles(topic.articles, mark)[:size]
+            fetched = fetched or bool(topic.articles)
+            if articles and (size, mark) in topic.summaries:
+                sections.append((label, topic.summaries[(size, mark)], articles))
+                user.delivered[key] = advance(user.delivered.get(key, mark), articles)
+        if Config.DEDUP_ENABLED and len(sections) > 1:
+            sections = dedup_sections(sections)
+
+        if not sections:
+            reason = "no new articles" if fetched else "no articles"
+            print(f"  {reason.capitalize()} for {user.username}, skipping email")
+            self.on_done(user, "skipped", reason)
+            return None
+
+        topics = [label for _, label, _ in user.sections]
+        topics_str = ", ".join(topics[:3])
+        if len(topics) > 3:
+            topics_str += "..."
+        subject = f"News-Flash Daily Summary | {topics_str}"
+
+        print(f"  Sending email to {user.email}")
+        if not self.mailer.send_digest(subject, sections, recipient=user.email):
+            print(f"  ✗ Error sending email to {user.username}")
+            self.on_done(user, "failed", "SMTP send failed")
+            return None
+        print(f"  ✓ Email sent successfully to {user.username}")
+        self.on_done(user, "sent", None)
+        return user
@@ -1,93 +1,226 @@
 """
 Scheduled Email Sender for News-Flash
 Sends personalized news summaries to users at their preferred time.
-Run this script every hour via Task Scheduler/Cron.
+Run with --daemon to keep one scheduler resident (checks every minute, so
+digests go out at each user's exact time), or every hour (or more often) via
+Task Scheduler/Cron; each run sends to every user whose next_send_at has
+passed. Progress is kept in the send_job table, so an interrupted run resumes
+instead of skipping or re-sending, and several copies can share one window.
 """
 
+import argparse
+import signal
 import sys
 import os
+import threading
+import time
 
 # Set working directory to the webapp directory to ensure DB is found
 os.chdir(os.path.dirname(__file__))
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from datetime import datetime
-from app import app, db, User, NewsPreference
-from fetch_news import fetch_news
-from summarize import summarize_news
-from emailer import send_email
+import metrics
+from app import app, db, count_queries, due_users_with_topics, users_with_topics
+from config import Config
+from pipeline import StagedPipeline
+from topic_cache import TopicCache
+from emailer import BulkMailer
+from planner import PlanRunner, build_plan
+from job_queue import SendJobQueue
+from delivery_marks import load_marks, save_marks
 
-def send_user_emails():
-    """Send emails to users whose preferred time matches current hour."""
+def send_user_emails(dry_run: bool = False, metrics_json: str = None):
+    """
+    Send emails to users whose next scheduled send time has passed.
+    
+    Due users are first recorded as send jobs (and their schedule advanced),
+    then claimed in batches and sent. A crashed or killed run leaves its jobs
+    leased; the next run picks them up once the lease expires, and jobs that
+    already went out are not sent again.
+    
+    Args:
+        dry_run (bool): Only print the topic plan and expected upstream calls
+        metrics_json (str): Write the run's metrics report here ("-" for stdout)
+    """
     
     with app.app_context():
         # Ensure tables exist
         db.create_all()
         
-        current_time = datetime.now().strftime('%H:%M')
-        current_hour = datetime.now().strftime('%H')
-        
-        print(f"[{datetime.now()}] Checking for emails to send at {current_time}")
+        now = datetime.utcnow()
         
-        # Find users whose preferred time hour matches current hour and email is enabled
-        users = User.query.filter(
-            User.email_enabled == True,
-            User.preferred_email_time.startswith(current_hour)
-        ).all()
+        print(f"[{datetime.now()}] Checking for emails due by {now.strftime('%H:%M')} UTC")
         
-        if not users:
-            print(f"No users scheduled for {current_hour}:00")
+        if dry_run:
+            # Single range scan on (email_enabled, next_send_at) plus one batched topic query
+            with count_queries() as queries:
+                users = due_users_with_topics(now)
+            print(f"Found {len(users)} users due ({queries['count']} queries)")
+            marks = load_marks(user.id for user in users) if Config.INCREMENTAL_DIGESTS else None
+            print(f"\n{build_plan(users, marks).describe()}")
+            print("Dry run: no emails sent, schedules not advanced")
             return
         
-        print(f"Found {len(users)} users to send emails to")
+        cache = TopicCache()
         
-        for user in users:
-            try:
-                print(f"\n--- Processing user: {user.username} ({user.email}) ---")
-                
-                # Get user's topics
-                if not user.preferences:
-                    print(f"  No topics set for {user.username}, skipping")
-                    continue
-                
-                # Combine all topics or send separate emails per topic
-                all_articles = []
-                all_summaries = []
-                
-                for pref in user.preferences:
-                    print(f"  Fetching news for topic: {pref.topic}")
-                    articles = fetch_news(pref.topic, max_articles=pref.max_articles)
-                    
-                    if articles:
-                        print(f"  Found {len(articles)} articles for {pref.topic}")
-                        summary = summarize_news(articles)
-                        
-                        all_articles.extend(articles)
-                        all_summaries.append(f"<h3>{pref.topic}</h3>{summary}")
-                
-                if not all_articles:
-                    print(f"  No articles found for {user.username}, skipping email")
-                    continue
-                
-                # Create combined summary
-                combined_summary = "<br><br>".join(all_summaries)
-                
-                # Create email subject
-                topics_str = ", ".join([p.topic for p in user.preferences[:3]])
-                if len(user.preferences) > 3:
-                    topics_str += "..."
-                subject = f"News-Flash Daily Summary | {topics_str}"
-                
-                # Send email
-                print(f"  Sending email to {user.email}")
-                send_email(user.email, subject, combined_summary, all_articles)
-                print(f"  ✓ Email sent successfully to {user.username}")
+        # One pool of authenticated SMTP connections for the whole run
+        with BulkMailer(connections=Config.SMTP_CONNECTIONS) as mailer:
+            _send_due(cache, mailer, now)
+        
+        cache.save()
+        
+        print(cache.report())
+        print(f"[{datetime.now()}] Email sending complete")
+        
+        if metrics_json:
+            metrics.write_json(metrics_json)
+
+
+def run_daemon(tick_seconds: int = None, metrics_json: str = None):
+    """
+    Run as a resident scheduler instead of an hourly cron job.
+    
+    Imports, db.create_all(), the NewsAPI session, LLM clients and SMTP
+    connections are set up once and stay warm. Every tick (on the minute by
+    default) sends to users whose next_send_at has passed, so digests go out
+    at each user's exact preferred_email_time rather than at the top of the
+    hour. Stops cleanly after the current tick on SIGINT/SIGTERM.
+    
+    Args:
+        tick_seconds (int): Seconds between checks. Defaults to SCHEDULER_TICK from config
+        metrics_json (str): Rewrite the cumulative metrics report here after each busy tick
+    """
+    tick = tick_seconds or Config.SCHEDULER_TICK
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    
+    with app.app_context():
+        db.create_all()
+        print(f"[{datetime.now()}] Scheduler daemon started (tick every {tick}s)")
+        
+        # Summaries only carry across ticks when a topic cache TTL is set
+        cache = TopicCache()
+        
+        with BulkMailer(connections=Config.SMTP_CONNECTIONS) as mailer:
+            while not stop.is_set():
+                if Config.TOPIC_CACHE_TTL <= 0:
+                    cache = TopicCache()
+                try:
+                    if _send_due(cache, mailer, datetime.utcnow(), quiet=True):
+                        cache.save()
+                        print(cache.report())
+                        if metrics_json:
+                            metrics.write_json(metrics_json)
+                except Exception as e:
+                    print(f"✗ Scheduler tick failed: {str(e)}")
+                finally:
+                    # Start each tick with a fresh session so user rows are re-read
+                    db.session.remove()
                 
-            except Exception as e:
-                print(f"  ✗ Error sending email to {user.username}: {str(e)}")
-                continue
+                mailer.close_idle(Config.SMTP_IDLE_TIMEOUT)
+                # Sleep to the next tick boundary (e.g. hh:mm:00)
+                stop.wait(tick - time.time() % tick)
+        
+        print(f"[{datetime.now()}] Scheduler daemon stopped")
+
+
+def _send_due(cache: TopicCache, mailer: BulkMailer, now: datetime, quiet: bool = False) -> int:
+    """
+    Queue newly due users, then claim and send jobs in batches until none are left.
+    
+    Returns:
+        int: Number of jobs claimed (0 when there was nothing to do)
+    """
+    claimed = sent = 0
+    started = time.perf_counter()
+    
+    with SendJobQueue() as queue:
+        due = queue.enqueue_due(now)
+        if due or not quiet:
+            print(f"[{datetime.now()}] Queued {due} newly due users")
         
-        print(f"\n[{datetime.now()}] Email sending complete")
+        while True:
+            jobs = queue.claim()
+            if not jobs:
+                break
+            claimed += len(jobs)
+            sent += _run_batch(queue, mailer, cache, jobs)
+            # Anything still leased here never reached the send stage
+            released = queue.release("topic fetch or summary failed")
+            if released:
+                print(f"  ⚠️  {released} jobs will be retried")
+        
+        if claimed or not quiet:
+            counts = queue.counts()
+            print(f"Emails sent this run: {sent}")
+            print("Send jobs: " + ", ".join(f"{status}={count}" for status, count in sorted(counts.items())))
+    
+    if claimed:
+        metrics.observe("newsflash_stage_seconds", time.perf_counter() - started, stage="scheduler_run")
+    return claimed
+
+
+def _run_batch(queue: SendJobQueue, mailer: BulkMailer, cache: TopicCache, jobs) -> int:
+    """Send one claimed batch of jobs topic-major; returns the number of emails sent."""
+    job_ids = {user_id: job_id for job_id, user_id, _ in jobs}
+    with count_queries() as queries:
+        users = users_with_topics(job_ids)
+    print(f"Claimed {len(jobs)} send jobs ({queries['count']} queries)")
+    
+    # Jobs for deleted, disabled or topic-less users are finished without sending
+    users = [user for user in users if user.email_enabled]
+    marks = load_marks(user.id for user in users) if Config.INCREMENTAL_DIGESTS else None
+    plan = build_plan(users, marks)
+    for user_id in set(job_ids) - {user.user_id for user in plan.users}:
+        queue.complete(job_ids[user_id], status="skipped", note="no user or topics")
+        metrics.inc("newsflash_send_jobs_total", status="skipped")
+    
+    skipped = set()
+    
+    def record(user, status, error):
+        metrics.inc("newsflash_send_jobs_total", status=status)
+        if status == "skipped":
+            skipped.add(user.email)
+        job_id = job_ids[user.user_id]
+        if status == "sent" and Config.INCREMENTAL_DIGESTS:
+            save_marks(queue.engine, user.user_id, user.delivered)
+        if status == "failed":
+            queue.fail(job_id, error)
+        else:
+            queue.complete(job_id, status=status, note=error)
+    
+    runner = PlanRunner(plan, cache, mailer, on_done=record)
+    pipeline = StagedPipeline([
+        ("fetch", runner.fetch_topic, Config.FETCH_WORKERS),
+        ("summarize", runner.summarize_topic, Config.SUMMARIZE_WORKERS),
+        ("send", runner.send_user, Config.SMTP_WORKERS),
+    ], queue_size=100)
+    sent = pipeline.run(plan.topics)
+    
+    print(f"\n{pipeline.report()}")
+    print(f"Emails sent: {len(sent)}/{len(plan.users)}")
+    failed = sorted({user.email for user in plan.users} - {user.email for user in sent} - skipped)
+    if failed:
+        print(f"Failed (will be retried): {', '.join(failed)}")
+    if skipped:
+        print(f"Skipped (no news): {', '.join(sorted(skipped))}")
+    return len(sent)
+
 
 if __name__ == "__main__":
-    send_user_emails()
+    parser = argparse.ArgumentParser(description="Send scheduled News-Flash digests")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print the send plan and expected upstream calls without sending")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Stay running and send every minute instead of exiting after one pass")
+    parser.add_argument("--tick", type=int, help="Seconds between checks in daemon mode")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="Write stage timings, upstream calls and cache hit ratios as JSON (- for stdout)")
+    args = parser.parse_args()
+    
+    if args.daemon and not args.dry_run:
+        run_daemon(tick_seconds=args.tick, metrics_json=args.metrics_json)
+    else:
+        send_user_emails(dry_run=args.dry_run, metrics_json=args.metrics_json)